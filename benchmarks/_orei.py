@@ -0,0 +1,22 @@
+"""Import the integration's Home Assistant–independent modules.
+
+The package ``__init__`` pulls in Home Assistant, which the benchmarks do not
+need. Register the package directory as a bare namespace so modules such as
+``orei_matrix.coordinator`` can be imported without it.
+"""
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1] / "custom_components" / "orei_matrix"
+
+
+def load(name):
+    """Return the ``orei_matrix.<name>`` module."""
+    if "orei_matrix" not in sys.modules:
+        package = types.ModuleType("orei_matrix")
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules["orei_matrix"] = package
+    return importlib.import_module(f"orei_matrix.{name}")
@@ -0,0 +1,137 @@
+"""Latency and throughput of OreiMatrixClient against the simulator.
+
+Scenarios:
+
+    4x4         every client command, one caller at a time
+    16x16       the same on a 16x16 matrix (larger bulk replies)
+    concurrent  many callers mixing reads and routes on one client
+
+For each scenario the report lists commands/sec, p50/p99 latency per
+command and the duration of a full poll cycle (power, routing and both
+link queries).
+
+    python benchmarks/bench_client.py [--rounds 50] [--delay 0.005]
+        [--callers 16] [--echo] [--prompt] [--fragment 7] [--garbage]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from _orei import load
+from simulator import OreiMatrixSimulator
+
+coordinator = load("coordinator")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def operations(client, inputs, outputs, rng):
+    """Map of command name -> zero-argument coroutine factory."""
+    return {
+        "get_type": client.get_type,
+        "get_power": client.get_power,
+        "get_output_source": lambda: client.get_output_source(rng.randint(1, outputs)),
+        "get_output_sources": client.get_output_sources,
+        "get_in_links": client.get_in_links,
+        "get_out_links": client.get_out_links,
+        "set_output_source": lambda: client.set_output_source(
+            rng.randint(1, inputs), rng.randint(1, outputs)
+        ),
+        "set_cec_in": lambda: client.set_cec_in(rng.randint(1, inputs), "on"),
+    }
+
+
+async def timed(samples, name, call):
+    start = time.perf_counter()
+    await call()
+    samples[name].append(time.perf_counter() - start)
+
+
+async def poll_cycle(client):
+    start = time.perf_counter()
+    await client.get_power()
+    await client.get_output_sources()
+    await client.get_in_links()
+    await client.get_out_links()
+    return time.perf_counter() - start
+
+
+async def run_scenario(name, sim, rounds, callers):
+    # No read cache: every call should reach the simulator
+    client = coordinator.OreiMatrixClient("127.0.0.1", sim.port, cache_ttl=0)
+    rng = random.Random(1)
+    ops = operations(client, sim.inputs, sim.outputs, rng)
+    samples = defaultdict(list)
+
+    # Warm up: connect and let bulk queries learn their line counts
+    await poll_cycle(client)
+
+    start = time.perf_counter()
+    if callers == 1:
+        for _ in range(rounds):
+            for op, call in ops.items():
+                await timed(samples, op, call)
+    else:
+        async def caller():
+            for _ in range(rounds):
+                op = rng.choice(list(ops))
+                await timed(samples, op, ops[op])
+
+        await asyncio.gather(*(caller() for _ in range(callers)))
+    elapsed = time.perf_counter() - start
+
+    cycles = [await poll_cycle(client) for _ in range(min(rounds, 10))]
+    await client.disconnect()
+
+    total = sum(len(s) for s in samples.values())
+    print(f"\n== {name}: {sim.inputs}x{sim.outputs}, {callers} caller(s) ==")
+    print(f"{total} commands in {elapsed:.2f} s -> {total / elapsed:.1f} commands/sec")
+    print(f"{'command':<22}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}")
+    for op, values in samples.items():
+        print(
+            f"{op:<22}{len(values):>6}"
+            f"{percentile(values, 50) * 1000:>10.1f}{percentile(values, 99) * 1000:>10.1f}"
+        )
+    print(f"{'poll cycle':<22}{len(cycles):>6}{statistics.median(cycles) * 1000:>10.1f}"
+          f"{max(cycles) * 1000:>10.1f}")
+
+
+async def main(args):
+    options = dict(
+        echo=args.echo,
+        prompt=args.prompt,
+        delay=args.delay,
+        fragment=args.fragment,
+        garbage=args.garbage,
+        seed=1,
+    )
+    scenarios = [
+        ("4x4", 4, 4, 1),
+        ("16x16", 16, 16, 1),
+        ("concurrent", 8, 8, args.callers),
+    ]
+    for name, inputs, outputs, callers in scenarios:
+        if args.scenario and name not in args.scenario:
+            continue
+        async with OreiMatrixSimulator(inputs=inputs, outputs=outputs, **options) as sim:
+            await run_scenario(name, sim, args.rounds, callers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=["4x4", "16x16", "concurrent"])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--callers", type=int, default=16)
+    parser.add_argument("--delay", type=float, default=0.005)
+    parser.add_argument("--echo", action="store_true")
+    parser.add_argument("--prompt", action="store_true")
+    parser.add_argument("--fragment", type=int, default=0)
+    parser.add_argument("--garbage", action="store_true")
+    asyncio.run(main(parser.parse_args()))
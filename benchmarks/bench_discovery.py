@@ -0,0 +1,64 @@
+"""Time a config-flow network scan against simulated matrices on loopback.
+
+Starts several simulated matrices of different sizes on 127.0.0.2, .3, …
+plus a Telnet service that is not a matrix, all on the same port, then
+scans 127.0.0.0/24 the way the config flow scans a LAN and checks that
+exactly the matrices are found, with the right port counts.
+
+    python benchmarks/bench_discovery.py [--matrices 3] [--concurrency 64]
+"""
+
+import argparse
+import asyncio
+import time
+
+from _orei import load
+from simulator import OreiMatrixSimulator
+
+discovery = load("discovery")
+
+SIZES = [(4, 4), (8, 8), (16, 4), (4, 2), (8, 4)]
+
+
+async def not_a_matrix(reader, writer):
+    """A Telnet login prompt that ignores whatever is typed."""
+    writer.write(b"Login: ")
+    try:
+        while await reader.read(1024):
+            pass
+    finally:
+        writer.close()
+
+
+async def main(matrices, concurrency):
+    sims = [
+        OreiMatrixSimulator(inputs=i, outputs=o, echo=n % 2 == 1, prompt=n % 2 == 1)
+        for n, (i, o) in enumerate(SIZES[n % len(SIZES)] for n in range(matrices))
+    ]
+    port = await sims[0].start("127.0.0.2")
+    for n, sim in enumerate(sims[1:], start=3):
+        await sim.start(f"127.0.0.{n}", port)
+    other = await asyncio.start_server(not_a_matrix, f"127.0.0.{matrices + 2}", port)
+
+    try:
+        start = time.perf_counter()
+        found = await discovery.scan(["127.0.0.1/24"], port, concurrency=concurrency)
+        elapsed = time.perf_counter() - start
+    finally:
+        other.close()
+        for sim in sims:
+            await sim.stop()
+
+    print(f"scanned 127.0.0.0/24 port {port}, concurrency {concurrency}: {elapsed * 1000:.0f} ms")
+    for device in sorted(found):
+        print(f"  {device.host:<12}{device.model:<20}{device.inputs}x{device.outputs}")
+    expected = {(f"127.0.0.{n}", sim.inputs, sim.outputs) for n, sim in enumerate(sims, start=2)}
+    assert {(d.host, d.inputs, d.outputs) for d in found} == expected, "unexpected scan result"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--matrices", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=discovery.SCAN_CONCURRENCY)
+    args = parser.parse_args()
+    asyncio.run(main(args.matrices, args.concurrency))
@@ -0,0 +1,96 @@
+"""Entity state writes per refresh on a 16x16 matrix.
+
+Polls the simulator like the coordinator does (power, routing and both link
+queries) while a random mix of events happens between refreshes: nothing,
+a front-panel route change, a cable hot-plug or a power cycle. For every
+refresh that changed the data it counts the state writes of one media
+player, one button and one link sensor per output, one link sensor per
+input and the power switch, once for the old fan-out (every entity writes
+on every update) and once for per-output listeners fed by the state diff.
+
+    python benchmarks/bench_fanout.py [--refreshes 200] [--size 16] [--seed 1]
+"""
+
+import argparse
+import asyncio
+import random
+
+from _orei import load
+from simulator import OreiMatrixSimulator
+
+coordinator = load("coordinator")
+diff = load("diff")
+routing = load("routing")
+
+EVENTS = ("none", "none", "none", "route", "route", "in_link", "out_link", "power")
+
+
+def listeners(inputs, outputs):
+    """Listener contexts of the entities, as the platforms register them."""
+    media_players = list(range(1, outputs + 1))
+    buttons = [diff.MATRIX] * outputs
+    switch = [diff.MATRIX]
+    links = [diff.link_context("in", port) for port in range(1, inputs + 1)]
+    links += [diff.link_context("out", port) for port in range(1, outputs + 1)]
+    return media_players + buttons + switch + links
+
+
+async def poll(client, previous):
+    """One coordinator refresh, merged into the previous routing state."""
+    data = {"power": await client.get_power(), "routing": previous.get("routing") or routing.RoutingState()}
+    if data["power"]:
+        data["routing"] = data["routing"].updated(
+            routes=await client.get_output_sources(),
+            in_links=await client.get_in_links(),
+            out_links=await client.get_out_links(),
+        )
+    return data
+
+
+def apply_event(sim, event, rng):
+    if event == "route":
+        sim.routes[rng.randint(1, sim.outputs)] = rng.randint(1, sim.inputs)
+    elif event == "in_link":
+        port = rng.randint(1, sim.inputs)
+        sim.in_links[port] = not sim.in_links[port]
+    elif event == "out_link":
+        port = rng.randint(1, sim.outputs)
+        sim.out_links[port] = not sim.out_links[port]
+    elif event == "power":
+        sim.power = not sim.power
+
+
+async def main(refreshes, size, seed):
+    rng = random.Random(seed)
+    contexts = listeners(size, size)
+    fanouts = before = after = 0
+
+    async with OreiMatrixSimulator(inputs=size, outputs=size) as sim:
+        client = coordinator.OreiMatrixClient("127.0.0.1", sim.port, cache_ttl=0)
+        previous = await poll(client, {})
+        for _ in range(refreshes):
+            apply_event(sim, rng.choice(EVENTS), rng)
+            data = await poll(client, previous)
+            if data == previous:
+                # always_update=False: unchanged refreshes notify nobody
+                continue
+            fanouts += 1
+            changed = diff.changed_contexts(previous, data)
+            before += len(contexts)
+            after += sum(diff.should_notify(c, changed) for c in contexts)
+            previous = data
+        await client.disconnect()
+
+    print(f"{size}x{size}, {len(contexts)} entities, {refreshes} refreshes, {fanouts} with changes")
+    print(f"{'fan-out':<20}{'writes':>10}{'per refresh':>14}")
+    for name, writes in (("every entity", before), ("per-output diff", after)):
+        print(f"{name:<20}{writes:>10}{writes / refreshes:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--refreshes", type=int, default=200)
+    parser.add_argument("--size", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.refreshes, args.size, args.seed))
@@ -0,0 +1,68 @@
+"""Per-command latency of OreiMatrixClient with and without response framing.
+
+Runs the simulator with a fixed reply delay, then times the same command
+mix through a client that frames responses (prompt / expected line count)
+and through one that only stops on the 0.3 s idle timeout, which is how the
+client behaved before framing.
+
+    python benchmarks/bench_framing.py [--rounds 10] [--delay 0.02]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from _orei import load
+from simulator import OreiMatrixSimulator
+
+coordinator = load("coordinator")
+
+
+class LegacyClient(coordinator.OreiMatrixClient):
+    """Client that never knows when a response is complete."""
+
+    def _expected_lines(self, cmd):
+        return None
+
+
+async def measure(client, rounds):
+    commands = {
+        "get_type": client.get_type,
+        "get_power": client.get_power,
+        "get_output_sources": client.get_output_sources,
+        "set_output_source": lambda: client.set_output_source(2, 1),
+    }
+    results = {}
+    for name, call in commands.items():
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await call()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = statistics.median(samples)
+    start = time.perf_counter()
+    await client.get_power()
+    await client.get_output_sources()
+    results["poll cycle"] = (time.perf_counter() - start) * 1000
+    await client.disconnect()
+    return results
+
+
+async def main(rounds, delay):
+    async with OreiMatrixSimulator(delay=delay) as sim:
+        before = await measure(LegacyClient("127.0.0.1", sim.port, cache_ttl=0), rounds)
+        after = await measure(coordinator.OreiMatrixClient("127.0.0.1", sim.port, cache_ttl=0), rounds)
+
+    print(f"reply delay {delay * 1000:.0f} ms, median of {rounds} rounds")
+    print(f"{'command':<20}{'before ms':>12}{'after ms':>12}")
+    for name in before:
+        print(f"{name:<20}{before[name]:>12.1f}{after[name]:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.delay))
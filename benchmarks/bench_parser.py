@@ -0,0 +1,118 @@
+"""Check the response parser against the corpus and time it.
+
+Both go through the client's own read path: the raw bytes are served by a
+stream reader and read with the receive buffer, framing and per-line
+parsing the client uses on the socket. Every case in parser_corpus.py must
+read into exactly its expected records; the script exits non-zero
+otherwise. It then times reading a 16x16 bulk routing reply that way and
+with the per-method token loops the parser replaced.
+
+    python benchmarks/bench_parser.py [--iterations 20000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import timeit
+from contextlib import aclosing
+
+from _orei import load
+from parser_corpus import CASES, big_route_response
+
+coordinator = load("coordinator")
+parser = load("parser")
+
+
+def as_tuple(record):
+    if isinstance(record, parser.Route):
+        return ("route", record.output, record.input)
+    if isinstance(record, parser.Link):
+        return ("link", record.direction, record.port, record.connected)
+    if isinstance(record, parser.Power):
+        return ("power", record.on)
+    return ("type", record.name)
+
+
+async def read(client, raw, cmd):
+    """The records `client` reads for `cmd` from `raw`, without a socket."""
+    client._reader = asyncio.StreamReader()
+    client._reader.feed_data(raw)
+    client._reader.feed_eof()
+    client._rx.clear()
+    async with aclosing(client._iter_response(cmd)) as response:
+        return [record async for record in response]
+
+
+async def check_corpus():
+    failures = 0
+    for name, cmd, raw, expected in CASES:
+        client = coordinator.OreiMatrixClient("127.0.0.1")
+        got = [as_tuple(r) for r in await read(client, raw, cmd)]
+        if got != expected:
+            failures += 1
+            print(f"FAIL {name}: expected {expected}, got {got}")
+    print(f"corpus: {len(CASES) - failures}/{len(CASES)} cases pass")
+    return failures == 0
+
+
+def legacy_output_sources(raw, cmd):
+    """The byte filter, line cleanup and token loop the client used before."""
+    filtered = bytes(b for b in raw if b < 0x80)
+    text = filtered.decode("ascii", errors="ignore").strip()
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    cleaned = []
+    for line in lines:
+        if (
+            line.startswith(cmd.split()[0]) or
+            line.startswith("********") or
+            line.startswith("FW Version") or
+            line == ">" or
+            "Welcome" in line
+        ):
+            continue
+        cleaned.append(line.strip(">"))
+
+    response = {}
+    for res in cleaned:
+        res = res.lower().replace("->", " -> ").replace(":", " ")
+        parts = res.split()
+        output_id = None
+        input_id = None
+        try:
+            for i, token in enumerate(parts):
+                if token in ("output", "out") and i + 1 < len(parts):
+                    output_id = int(parts[i + 1])
+                if token in ("input", "in") and i + 1 < len(parts):
+                    input_id = int(parts[i + 1])
+            response[output_id] = input_id
+        except ValueError:
+            return None
+    return response
+
+
+async def client_output_sources(client, raw, cmd):
+    return {r.output: r.input for r in await read(client, raw, cmd)}
+
+
+async def main(iterations):
+    ok = await check_corpus()
+
+    raw = big_route_response()
+    cmd = "r av out 0!"
+    client = coordinator.OreiMatrixClient("127.0.0.1")
+    assert legacy_output_sources(raw, cmd) == await client_output_sources(client, raw, cmd)
+    seconds = timeit.timeit(lambda: legacy_output_sources(raw, cmd), number=iterations)
+    print(f"{'token loops':<14} {seconds / iterations * 1e6:8.1f} us per 16x16 routing reply")
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await client_output_sources(client, raw, cmd)
+    seconds = time.perf_counter() - start
+    print(f"{'client read':<14} {seconds / iterations * 1e6:8.1f} us per 16x16 routing reply")
+    return ok
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=20000)
+    sys.exit(0 if asyncio.run(main(arg_parser.parse_args().iterations)) else 1)
@@ -0,0 +1,87 @@
+"""Click-to-switch latency while the connection is busy with polling.
+
+Several background pollers keep the connection saturated with power, bulk
+and per-port queries while routes are set at random intervals. The
+route latency is measured once with the client's priority queue and once
+with a first-come, first-served queue, which is how the client behaved with
+a plain lock.
+
+    python benchmarks/bench_priority.py [--clicks 30] [--pollers 4] [--delay 0.02]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from _orei import load
+from simulator import OreiMatrixSimulator
+
+coordinator = load("coordinator")
+scheduler = load("scheduler")
+
+
+class FifoQueue(scheduler.CommandQueue):
+    """Ignores priorities, like the asyncio.Lock it replaced."""
+
+    async def acquire(self, priority, tag=None):
+        await super().acquire(scheduler.PRIORITY_READ, tag)
+
+
+async def poller(client, stop, offset, ports):
+    """Poll power, bulk state and per-port state, offset from other pollers."""
+    port = offset
+    with scheduler.background():
+        while not stop.is_set():
+            port = port % ports + 1
+            await client.get_power()
+            await client.get_output_sources()
+            await client.get_output_source(port)
+            await client.get_in_link(port)
+            await client.get_out_link(port)
+
+
+async def measure(client, sim, clicks, pollers, rng):
+    # Learn the bulk reply sizes first so every read is framed
+    await client.get_output_sources()
+    stop = asyncio.Event()
+    tasks = [
+        asyncio.create_task(poller(client, stop, n * sim.outputs // pollers, sim.outputs))
+        for n in range(pollers)
+    ]
+    samples = []
+    for _ in range(clicks):
+        await asyncio.sleep(rng.uniform(0.02, 0.1))
+        start = time.perf_counter()
+        await client.set_output_source(rng.randint(1, sim.inputs), rng.randint(1, sim.outputs))
+        samples.append((time.perf_counter() - start) * 1000)
+    stop.set()
+    await asyncio.gather(*tasks)
+    await client.disconnect()
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)], samples[-1]
+
+
+async def main(clicks, pollers, delay):
+    results = {}
+    async with OreiMatrixSimulator(inputs=16, outputs=16, delay=delay) as sim:
+        for name, queue in (("fifo lock", FifoQueue), ("priority queue", scheduler.CommandQueue)):
+            # No read cache: every poll should reach the simulator
+            client = coordinator.OreiMatrixClient("127.0.0.1", sim.port, cache_ttl=0)
+            client._queue = queue()
+            results[name] = await measure(client, sim, clicks, pollers, random.Random(1))
+
+    print(f"16x16, reply delay {delay * 1000:.0f} ms, {pollers} poller(s), {clicks} route changes")
+    print(f"{'queue':<18}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, (p50, p95, worst) in results.items():
+        print(f"{name:<18}{p50:>10.1f}{p95:>10.1f}{worst:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=30)
+    parser.add_argument("--pollers", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.clicks, args.pollers, args.delay))
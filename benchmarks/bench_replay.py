@@ -0,0 +1,118 @@
+"""Replay recorded matrix traffic through the client and time every command.
+
+Serves each trace with replay.ReplayServer and has the client issue the
+recorded commands through its public methods, so responses go through the
+same framing, parsing and caching as with the real device. Commands go out
+in recorded order, each once the reply to the one before is in; --speed
+only shortens the idle gaps between them (0 removes them), so latencies
+measure the client, not commands queueing behind each other. Prints
+per-command latency and fails if a command went unanswered or, with
+--max-p99-ms, if any command type got slower.
+
+    python benchmarks/bench_replay.py benchmarks/traces/*.trace [--speed 10] [--max-p99-ms 100]
+"""
+
+import argparse
+import asyncio
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+from _orei import load
+from replay import ReplayServer, _commands
+
+coordinator = load("coordinator")
+recorder = load("recorder")
+stats = load("stats")
+
+_READ_ROUTES = re.compile(r"r av out (\d+)!")
+_READ_LINKS = re.compile(r"r link (in|out) (\d+)!")
+_SET_ROUTE = re.compile(r"s in (\d+) av out (\d+)!")
+_SET_CEC = re.compile(r"s cec (in|hdmi out) (\d+) (\S+)!")
+
+
+async def issue(client, cmd):
+    """Send one recorded command the way the integration would."""
+    if cmd == "r type!":
+        return await client.get_type()
+    if cmd == "r power!":
+        return await client.get_power()
+    if m := _READ_ROUTES.fullmatch(cmd):
+        port = int(m[1])
+        return await (client.get_output_source(port) if port else client.get_output_sources())
+    if m := _READ_LINKS.fullmatch(cmd):
+        port = int(m[2])
+        if m[1] == "in":
+            return await (client.get_in_link(port) if port else client.get_in_links())
+        return await (client.get_out_link(port) if port else client.get_out_links())
+    if m := _SET_ROUTE.fullmatch(cmd):
+        return await client.set_output_source(int(m[1]), int(m[2]))
+    if cmd.startswith("s power "):
+        return await client.set_power(cmd == "s power 1!")
+    if m := _SET_CEC.fullmatch(cmd):
+        if m[1] == "in":
+            return await client.set_cec_in(int(m[2]), m[3])
+        return await client.set_cec_out(int(m[2]), m[3])
+    raise ValueError(f"No client method sends {cmd!r}")
+
+
+def p99(samples):
+    return statistics.quantiles(samples, n=100)[98] if len(samples) > 1 else samples[0]
+
+
+async def replay(path, speed):
+    _, events = recorder.load(path)
+    schedule = [(at, [c.decode("latin-1").strip() for c in _commands(data)])
+                for at, kind, data in events if kind == recorder.SENT]
+    if not schedule:
+        return {}, 0.0, []
+    first = schedule[0][0]
+    latencies = defaultdict(list)
+
+    async def timed(cmd):
+        start = time.perf_counter()
+        await issue(client, cmd)
+        latencies[stats.command_type(cmd)].append((time.perf_counter() - start) * 1000)
+
+    async with ReplayServer(events, speed) as server:
+        client = coordinator.OreiMatrixClient("127.0.0.1", server.port, cache_ttl=0)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for at, cmds in schedule:
+            # Never before the previous reply is in, as when recorded;
+            # commands sent in one write were issued together
+            if speed:
+                await asyncio.sleep(max(0.0, started + (at - first) / speed - loop.time()))
+            await asyncio.gather(*(timed(cmd) for cmd in cmds))
+        elapsed = loop.time() - started
+        await client.disconnect()
+    return latencies, elapsed, server.unanswered
+
+
+async def main(paths, speed, max_p99):
+    ok = True
+    for path in paths:
+        latencies, elapsed, unanswered = await replay(path, speed)
+        count = sum(map(len, latencies.values()))
+        print(f"== {path}: {count} commands in {elapsed:.2f} s at speed {speed or 'max'}")
+        print(f"{'command':<24}{'n':>5}{'p50 ms':>10}{'p99 ms':>10}")
+        for cmd, samples in sorted(latencies.items()):
+            slow = max_p99 is not None and p99(samples) > max_p99
+            ok &= not slow
+            print(f"{cmd:<24}{len(samples):>5}{statistics.median(samples):>10.1f}{p99(samples):>10.1f}"
+                  f"{'  over budget' if slow else ''}")
+        if unanswered:
+            ok = False
+            print(f"unanswered: {sorted(set(unanswered))}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("traces", nargs="+")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--max-p99-ms", type=float, default=None)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.traces, args.speed, args.max_p99_ms)) else 1)
@@ -0,0 +1,105 @@
+"""Time until the integration's entities can be created at startup.
+
+Compares the blocking setup (connect, detect the model, then a full first
+refresh before any entity exists) with setup from the persisted snapshot
+(load the last-known state, create entities, refresh in the background),
+against three matrices: a reachable one, an unreachable one (nothing
+listening) and an asleep one (accepts connections but never answers).
+
+    python benchmarks/bench_startup.py [--delay 0.02] [--size 8]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+from _orei import load
+from simulator import OreiMatrixSimulator
+
+coordinator = load("coordinator")
+routing = load("routing")
+snapshot = load("snapshot")
+# An asleep matrix makes every read log a warning
+logging.getLogger("orei_matrix").setLevel(logging.ERROR)
+
+
+async def first_refresh(client):
+    """The reads of the coordinator's first update, model detection included."""
+    data = {"type": await client.get_type(), "power": await client.get_power()}
+    data["routing"] = routing.RoutingState.from_dicts(
+        routes=await client.get_output_sources(),
+        in_links=await client.get_in_links(),
+        out_links=await client.get_out_links(),
+    )
+    return data
+
+
+async def blocking_setup(port):
+    client = coordinator.OreiMatrixClient("127.0.0.1", port, cache_ttl=0)
+    start = time.perf_counter()
+    try:
+        data = await first_refresh(client)
+        outcome = "ready" if data["type"] else "ready, but no replies"
+    except Exception as err:
+        outcome = f"not ready ({type(err).__name__})"
+    elapsed = time.perf_counter() - start
+    await client.disconnect()
+    return elapsed, outcome
+
+
+async def snapshot_setup(port, path):
+    client = coordinator.OreiMatrixClient("127.0.0.1", port, cache_ttl=0)
+    start = time.perf_counter()
+    restored = snapshot.load(json.loads(await asyncio.to_thread(path.read_text)))
+    elapsed = time.perf_counter() - start
+    outcome = "ready (restored)" if restored else "no snapshot"
+    # The live refresh that follows in the background
+    refresh = asyncio.create_task(first_refresh(client))
+    try:
+        data = await refresh
+        outcome += ", refreshed" if data["type"] else ", no replies"
+    except Exception:
+        outcome += ", refresh failed"
+    await client.disconnect()
+    return elapsed, outcome
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def main(delay, size):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "orei_matrix.snapshot"
+        results = []
+        async with OreiMatrixSimulator(inputs=size, outputs=size, delay=delay) as sim:
+            client = coordinator.OreiMatrixClient("127.0.0.1", sim.port)
+            path.write_text(json.dumps(snapshot.dump(await first_refresh(client))))
+            await client.disconnect()
+            results.append(("reachable", await blocking_setup(sim.port), await snapshot_setup(sim.port, path)))
+
+        port = closed_port()
+        results.append(("unreachable", await blocking_setup(port), await snapshot_setup(port, path)))
+
+        async with OreiMatrixSimulator(inputs=size, outputs=size, delay=3600) as sim:
+            results.append(("asleep", await blocking_setup(sim.port), await snapshot_setup(sim.port, path)))
+
+    print(f"{size}x{size}, reply delay {delay * 1000:.0f} ms")
+    print(f"{'matrix':<14}{'blocking ms':>13}  {'outcome':<36}{'snapshot ms':>13}  outcome")
+    for name, (b_time, b_outcome), (s_time, s_outcome) in results:
+        print(f"{name:<14}{b_time * 1000:>13.1f}  {b_outcome:<36}{s_time * 1000:>13.2f}  {s_outcome}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=0.02)
+    parser.add_argument("--size", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.delay, args.size))
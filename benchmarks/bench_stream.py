@@ -0,0 +1,123 @@
+"""Cost of turning received bytes into reply lines, by framing strategy.
+
+Feeds a 16x16 bulk routing reply (echo, noise bytes, prompt) in read-sized
+chunks to three line framers and reports time and peak memory per
+response, and how much of the reply must arrive before the first line is
+available:
+
+    accumulate   collect the whole reply, then filter, decode, split and
+                 strip it, as the client originally did
+    bytearray    pop lines off a bytearray, cleaning and decoding each one
+                 separately (the previous incremental reader)
+    LineBuffer   clean and decode each chunk once, cut lines out of the
+                 decoded text (the current reader)
+
+    python benchmarks/bench_stream.py [--size 16] [--chunk 64] [--iterations 20000]
+"""
+
+import argparse
+import timeit
+import tracemalloc
+
+from _orei import load
+from parser_corpus import big_route_response
+
+parser = load("parser")
+
+CMD = "r av out 0!"
+NOISE = bytes([0xFF, 0xFB, 0xFF, 0xFD])
+
+
+def accumulate(chunks):
+    """Yield lines only once the whole reply is in."""
+    raw = bytearray()
+    for chunk in chunks:
+        raw.extend(chunk)
+        yield from ()
+    filtered = bytes(b for b in raw if b < 0x80)
+    text = filtered.decode("ascii", errors="ignore").strip()
+    for line in [ln.strip() for ln in text.splitlines() if ln.strip()]:
+        if not parser.is_noise(line, CMD):
+            yield line.strip(">")
+
+
+def per_line_bytearray(chunks):
+    """Yield lines as they complete, cleaning each one on its own."""
+    rx = bytearray()
+    for chunk in chunks:
+        rx.extend(chunk)
+        while (end := rx.find(b"\n")) >= 0:
+            line = rx[:end].translate(None, parser._NOISE_BYTES).decode("ascii").strip()
+            del rx[:end + 1]
+            line = line.lstrip("> ") or line
+            if line and not parser.is_noise(line, CMD):
+                yield line.strip(">")
+    line = rx.translate(None, parser._NOISE_BYTES).decode("ascii").strip()
+    if line and line != ">":
+        yield line.strip(">")
+
+
+def line_buffer(chunks):
+    """Yield lines as they complete, from text decoded once per chunk."""
+    rx = parser.LineBuffer()
+    for chunk in chunks:
+        rx.feed(chunk)
+        while (line := rx.take()) is not None:
+            if line and line != ">" and not parser.is_noise(line, CMD):
+                yield line.strip(">")
+
+
+FRAMERS = {"accumulate": accumulate, "bytearray": per_line_bytearray, "LineBuffer": line_buffer}
+
+
+def first_line_after(framer, chunks):
+    """Bytes received before the framer produced its first line."""
+    received = 0
+
+    def counting():
+        nonlocal received
+        for chunk in chunks:
+            received += len(chunk)
+            yield chunk
+
+    next(framer(counting()))
+    return received
+
+
+def peak_kib(framer, chunks):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    for _ in framer(chunks):
+        pass
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main(size, chunk, iterations):
+    raw = big_route_response(size, size)
+    # Telnet negotiation noise in front, as some units send with every reply
+    raw = NOISE + raw
+    chunks = [raw[i:i + chunk] for i in range(0, len(raw), chunk)]
+    expected = list(accumulate(chunks))
+    assert len(expected) == size
+
+    print(f"{size}x{size} routing reply, {len(raw)} bytes in {len(chunks)} chunks of {chunk}")
+    print(f"{'framer':<12}{'us/reply':>10}{'peak KiB':>10}{'1st line after':>16}")
+    for name, framer in FRAMERS.items():
+        assert list(framer(chunks)) == expected, name
+        seconds = timeit.timeit(lambda: list(framer(chunks)), number=iterations)
+        print(
+            f"{name:<12}{seconds / iterations * 1e6:>10.1f}{peak_kib(framer, chunks):>10.1f}"
+            f"{first_line_after(framer, chunks):>10} bytes"
+        )
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=16)
+    arg_parser.add_argument("--chunk", type=int, default=64)
+    arg_parser.add_argument("--iterations", type=int, default=20000)
+    args = arg_parser.parse_args()
+    main(args.size, args.chunk, args.iterations)
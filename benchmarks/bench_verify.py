@@ -0,0 +1,94 @@
+"""How many routes actually take, with and without route verification.
+
+Runs batches of route changes against a simulated busy matrix that drops
+some route switches entirely and applies others without replying, then
+checks the simulator's routing after every batch. The unverified client
+sends each batch and ignores the replies, as the client did before, so
+a dropped route stays wrong until the next routing poll; the verified
+client checks acknowledgements, confirms the unacknowledged routes with
+one bulk read and re-sends only those that did not take.
+
+    python benchmarks/bench_verify.py [--batches 20] [--drop-routes 0.1] [--drop-acks 0.1]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from _orei import load
+from simulator import OreiMatrixSimulator
+
+coordinator = load("coordinator")
+
+
+class UnverifiedClient(coordinator.OreiMatrixClient):
+    """Client that sends routes and trusts they were taken."""
+
+    async def set_output_sources(self, routes):
+        await asyncio.gather(*(self._route(inp, out) for out, inp in routes.items()))
+        return dict.fromkeys(routes, True)
+
+
+async def measure(client_class, args):
+    rng = random.Random(1)
+    sim = OreiMatrixSimulator(
+        inputs=args.size,
+        outputs=args.size,
+        delay=args.delay,
+        drop_routes=args.drop_routes,
+        drop_acks=args.drop_acks,
+        seed=1,
+    )
+    async with sim:
+        client = client_class("127.0.0.1", sim.port, cache_ttl=0)
+        wrong = reported_wrong = 0
+        samples = []
+        for _ in range(args.batches):
+            routes = {
+                out: rng.randint(1, args.size)
+                for out in rng.sample(range(1, args.size + 1), args.routes)
+            }
+            start = time.perf_counter()
+            results = await client.set_output_sources(routes)
+            samples.append((time.perf_counter() - start) * 1000)
+            for out, inp in routes.items():
+                if sim.routes[out] != inp:
+                    wrong += 1
+                    reported_wrong += not results[out]
+        commands = len(sim.commands)
+        await client.disconnect()
+    return {
+        "wrong": wrong,
+        "reported": reported_wrong,
+        "p50": statistics.median(samples),
+        "p95": statistics.quantiles(samples, n=20)[18],
+        "commands": commands,
+    }
+
+
+async def main(args):
+    total = args.batches * args.routes
+    print(
+        f"{args.size}x{args.size}, {args.batches} batches of {args.routes} routes, "
+        f"{args.drop_routes:.0%} routes dropped, {args.drop_acks:.0%} acks dropped"
+    )
+    print(f"{'client':<12}{'wrong after call':>18}{'of them reported':>18}{'p50 ms':>9}{'p95 ms':>9}{'commands':>10}")
+    for name, client_class in (("unverified", UnverifiedClient), ("verified", coordinator.OreiMatrixClient)):
+        r = await measure(client_class, args)
+        print(
+            f"{name:<12}{r['wrong']:>10} / {total:<5}{r['reported']:>18}"
+            f"{r['p50']:>9.1f}{r['p95']:>9.1f}{r['commands']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--routes", type=int, default=4)
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.005)
+    parser.add_argument("--drop-routes", type=float, default=0.1)
+    parser.add_argument("--drop-acks", type=float, default=0.1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,112 @@
+"""Raw Orei response variants and the records they must parse into.
+
+Each case is (name, command, raw bytes, expected records). Records are
+written as plain tuples so the corpus does not depend on the parser module:
+("route", output, input), ("link", direction, port, connected),
+("power", on) and ("type", model).
+"""
+
+IAC = bytes([0xFF, 0xFB, 0x01, 0xFF, 0xFB, 0x03])
+
+CASES = [
+    (
+        "type, plain",
+        "r type!",
+        b"UHD48-EX230-K\r\n",
+        [("type", "UHD48-EX230-K")],
+    ),
+    (
+        "type, echo, banner and prompt",
+        "r type!",
+        b"********************\r\nWelcome to HDMI Matrix\r\nFW Version: 1.02\r\n"
+        b"********************\r\nr type!\r\nUHD44-EXB400R-K\r\n>",
+        [("type", "UHD44-EXB400R-K")],
+    ),
+    (
+        "power on",
+        "r power!",
+        b"power on\r\n",
+        [("power", True)],
+    ),
+    (
+        "power off, upper case with colon",
+        "r power!",
+        b"POWER: OFF\r\n>",
+        [("power", False)],
+    ),
+    (
+        "power set echo",
+        "s power 1!",
+        b"s power 1!\r\npower on\r\n",
+        [("power", True)],
+    ),
+    (
+        "single route, arrow",
+        "r av out 2!",
+        b"input 3 -> output 2\r\n",
+        [("route", 2, 3)],
+    ),
+    (
+        "single route, short words without spaces",
+        "r av out 2!",
+        b"in3->out2\r\n",
+        [("route", 2, 3)],
+    ),
+    (
+        "single route, output first",
+        "r av out 4!",
+        b"Output 4: Input 1\r\n",
+        [("route", 4, 1)],
+    ),
+    (
+        "route ack with Telnet negotiation bytes",
+        "s in 2 av out 1!",
+        IAC + b"input 2 -> output 1\r\n",
+        [("route", 1, 2)],
+    ),
+    (
+        "bulk routes, 4x4, prompt glued to the next line",
+        "r av out 0!",
+        b">input 1 -> output 1\r\ninput 1 -> output 2\r\n"
+        b"input 3 -> output 3\r\ninput 4 -> output 4\r\n>",
+        [("route", 1, 1), ("route", 2, 1), ("route", 3, 3), ("route", 4, 4)],
+    ),
+    (
+        "bulk routes, one garbled line is skipped",
+        "r av out 0!",
+        b"input 1 -> output 1\r\ninput ? -> output 2\r\ninput 2 -> output 3\r\n",
+        [("route", 1, 1), ("route", 3, 2)],
+    ),
+    (
+        "bulk routes, high-bit noise inside a line",
+        "r av out 0!",
+        b"input 1 -> out\xff\xfeput 1\r\ninput 2 -> output 2\n",
+        [("route", 1, 1), ("route", 2, 2)],
+    ),
+    (
+        "input links",
+        "r link in 0!",
+        b"hdmi input 1: connect\r\nhdmi input 2: disconnect\r\n"
+        b"hdmi input 3: connect\r\nhdmi input 4: disconnect\r\n",
+        [("link", "in", 1, True), ("link", "in", 2, False),
+         ("link", "in", 3, True), ("link", "in", 4, False)],
+    ),
+    (
+        "output links, past tense",
+        "r link out 0!",
+        b"HDMI Output 1 : Connected\r\nHDMI Output 2 : Disconnected\r\n",
+        [("link", "out", 1, True), ("link", "out", 2, False)],
+    ),
+    (
+        "single input link, short form",
+        "r link in 3!",
+        b"in 3 disconnect\r\n",
+        [("link", "in", 3, False)],
+    ),
+]
+
+
+def big_route_response(outputs=16, inputs=16):
+    """A bulk routing reply for a large matrix, with echo and prompt."""
+    lines = [f"input {(o - 1) % inputs + 1} -> output {o}" for o in range(1, outputs + 1)]
+    return ("r av out 0!\r\n" + "".join(f"{line}\r\n" for line in lines) + ">").encode()
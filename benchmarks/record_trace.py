@@ -0,0 +1,76 @@
+"""Record a trace of a real matrix (or the simulator) for replay.
+
+Runs the commands the integration uses — model detection, poll cycles and
+a route change that re-applies the current route, so nothing visibly
+switches — with the client's traffic recorder on, and writes the trace.
+
+    python benchmarks/record_trace.py 192.168.1.50 traces/uhd88-fw1.00.09.trace
+    python benchmarks/record_trace.py --simulate --echo --fragment 7 traces/sim.trace
+"""
+
+import argparse
+import asyncio
+
+from _orei import load
+from simulator import OreiMatrixSimulator
+
+coordinator = load("coordinator")
+
+
+async def session(client, rounds):
+    await client.get_type()
+    for _ in range(rounds):
+        await client.get_power()
+        routes = await client.get_output_sources()
+        await client.get_in_links()
+        await client.get_out_links()
+        if routes:
+            output_id, input_id = min(routes.items())
+            await client.set_output_source(input_id, output_id)
+            await client.get_output_source(output_id)
+
+
+async def record(host, port, path, rounds):
+    client = coordinator.OreiMatrixClient(host, port, cache_ttl=0)
+    recorder = client.start_recording()
+    try:
+        await session(client, rounds)
+    finally:
+        await client.disconnect()
+    client.stop_recording()
+    recorder.save(path)
+    print(f"{len(recorder.events)} events from {host}:{port} written to {path}")
+
+
+async def main(args):
+    if not args.simulate:
+        await record(args.host, args.port, args.path, args.rounds)
+        return
+    sim = OreiMatrixSimulator(
+        inputs=args.size,
+        outputs=args.size,
+        echo=args.echo,
+        prompt=args.echo,
+        delay=args.delay,
+        fragment=args.fragment,
+        garbage=args.garbage,
+        seed=1,
+    )
+    async with sim:
+        await record("127.0.0.1", sim.port, args.path, args.rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("host", nargs="?", default="127.0.0.1")
+    parser.add_argument("path")
+    parser.add_argument("--port", type=int, default=23)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--simulate", action="store_true", help="record the simulator instead")
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--echo", action="store_true", help="simulator echoes commands and prompts")
+    parser.add_argument("--delay", type=float, default=0.02)
+    parser.add_argument("--fragment", type=int, default=0)
+    parser.add_argument("--garbage", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,138 @@
+"""Serve a recorded Orei matrix Telnet session back to a client.
+
+Loads a trace written by the client's traffic recorder and answers every
+command with the bytes the real matrix sent after it, chunk for chunk and
+at the recorded pace (or faster), so banners, fragmentation, noise bytes
+and slow firmware reach the client exactly as they did in the field. A
+command recorded several times is answered with its recordings in turn,
+the last one repeating; commands the trace never saw get no answer.
+
+    python benchmarks/replay.py traces/simulator-8x8.trace --port 2323 --speed 1
+"""
+
+import argparse
+import asyncio
+
+from _orei import load
+
+recorder = load("recorder")
+
+
+def _commands(payload: bytes):
+    return [line + b"\r\n" for line in payload.replace(b"\r", b"").split(b"\n") if line.strip()]
+
+
+class ReplayServer:
+    """Answers commands from a recorded trace."""
+
+    def __init__(self, events, speed=1.0):
+        # 0 replays without any delay; 2 at twice the recorded pace
+        self.speed = speed
+        # Chunks received after connecting, as (offset seconds, bytes)
+        self.banner = []
+        # Sent payload -> recorded replies, each a list of (offset, bytes)
+        self.replies = {}
+        self.commands = []
+        self.unanswered = []
+        self._next = {}
+        self._server = None
+
+        chunks = None
+        started = 0.0
+        for at, kind, data in events:
+            if kind == recorder.CONNECTED:
+                chunks = self.banner if not self.banner and not self.replies else None
+                started = at
+            elif kind == recorder.SENT:
+                chunks = []
+                started = at
+                self.replies.setdefault(data, []).append(chunks)
+            elif kind == recorder.RECEIVED and chunks is not None:
+                chunks.append((at - started, data))
+
+    @classmethod
+    def from_file(cls, path, speed=1.0):
+        return cls(recorder.load(path)[1], speed)
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start listening and return the bound port."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        self.port = await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def _reply(self, payload: bytes):
+        """The recorded reply to a payload, trying its commands one by one
+        if it was not recorded as a whole (e.g. batched differently)."""
+        if payload in self.replies:
+            return self._take(payload)
+        chunks = []
+        for cmd in _commands(payload):
+            if cmd in self.replies:
+                chunks.extend(self._take(cmd))
+            else:
+                self.unanswered.append(cmd.decode("latin-1").strip())
+        return chunks
+
+    def _take(self, key):
+        replies = self.replies[key]
+        index = self._next.get(key, 0)
+        self._next[key] = index + 1
+        return replies[min(index, len(replies) - 1)]
+
+    async def _send(self, writer, chunks):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for offset, data in chunks:
+            if self.speed:
+                await asyncio.sleep(max(0.0, started + offset / self.speed - loop.time()))
+            writer.write(data)
+            await writer.drain()
+
+    async def _handle(self, reader, writer):
+        buffer = b""
+        try:
+            await self._send(writer, self.banner)
+            while data := await reader.read(4096):
+                buffer += data
+                end = buffer.rfind(b"\n") + 1
+                if not end:
+                    continue
+                payload, buffer = buffer[:end], buffer[end:]
+                self.commands.extend(c.decode("latin-1").strip() for c in _commands(payload))
+                await self._send(writer, self._reply(payload))
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve(args):
+    server = ReplayServer.from_file(args.trace, args.speed)
+    port = await server.start(args.host, args.port)
+    print(f"Replaying {args.trace} on {args.host}:{port} ({len(server.replies)} recorded payloads)")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2323)
+    parser.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,266 @@
+"""Asyncio emulation of an Orei HDMI matrix Telnet interface.
+
+Speaks the subset of the protocol the integration uses:
+
+    r type!                 model name
+    r power! / s power N!   power state
+    r av out N!             route of output N (0 = all outputs)
+    s in X av out Y!        route input X to output Y
+    r link in N!            input hot-plug state (0 = all inputs)
+    r link out N!           output hot-plug state (0 = all outputs)
+    s cec in N CMD!         CEC command to a source
+    s cec hdmi out N CMD!   CEC command to a display
+
+Behaviour knobs cover what differs between real units and networks: a
+connect banner, echo of the typed command, the `>` prompt, a reply delay,
+byte-level fragmentation, high-bit garbage bytes (Telnet negotiation
+noise) and a busy unit that drops route switches or their replies. The
+simulator can also emit unsolicited status lines, as the front panel or
+IR remote would.
+
+    python benchmarks/simulator.py --inputs 8 --outputs 8 --port 2323
+"""
+
+import argparse
+import asyncio
+import random
+import re
+
+BANNER = [
+    "**************************************",
+    "Welcome to HDMI Matrix",
+    "FW Version: 1.00.09",
+    "**************************************",
+]
+
+# High-bit noise some units emit around replies (Telnet IAC bytes and the like)
+GARBAGE = bytes([0xFF, 0xFB, 0xFF, 0xFD, 0x8A, 0xE0])
+
+
+class OreiMatrixSimulator:
+    """Emulated matrix serving any number of Telnet clients."""
+
+    def __init__(
+        self,
+        inputs=4,
+        outputs=4,
+        model=None,
+        banner=True,
+        echo=False,
+        prompt=False,
+        delay=0.0,
+        fragment=0,
+        garbage=False,
+        drop_routes=0.0,
+        drop_acks=0.0,
+        seed=None,
+    ):
+        self.inputs = inputs
+        self.outputs = outputs
+        self.model = model or f"UHD{inputs}{outputs}-EXB400R-K"
+        self.banner = banner
+        self.echo = echo
+        self.prompt = prompt
+        self.delay = delay
+        self.fragment = fragment
+        self.garbage = garbage
+        # Fraction of route switches ignored entirely / applied without a reply
+        self.drop_routes = drop_routes
+        self.drop_acks = drop_acks
+        self.power = True
+        self.routes = {out: (out - 1) % inputs + 1 for out in range(1, outputs + 1)}
+        self.in_links = dict.fromkeys(range(1, inputs + 1), True)
+        self.out_links = dict.fromkeys(range(1, outputs + 1), True)
+        self.commands = []
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._random = random.Random(seed)
+        self._writers = set()
+        self._server = None
+        self._handlers = [
+            (re.compile(r"r type"), self._type),
+            (re.compile(r"r power"), self._get_power),
+            (re.compile(r"s power (\d)"), self._set_power),
+            (re.compile(r"r av out (\d+)"), self._get_route),
+            (re.compile(r"s in (\d+) av out (\d+)"), self._set_route),
+            (re.compile(r"r link in (\d+)"), self._get_in_link),
+            (re.compile(r"r link out (\d+)"), self._get_out_link),
+            (re.compile(r"s cec in (\d+) (\w+)"), self._cec_in),
+            (re.compile(r"s cec hdmi out (\d+) (\w+)"), self._cec_out),
+        ]
+
+    # -----------------------
+    # Server lifecycle
+    # -----------------------
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start listening and return the bound port."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        for writer in list(self._writers):
+            writer.close()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        self.port = await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            if self.banner:
+                await self._send(writer, BANNER)
+            while line := await reader.readline():
+                self.bytes_in += len(line)
+                cmd = line.decode("ascii", errors="ignore").strip()
+                if not cmd:
+                    continue
+                self.commands.append(cmd)
+                if cmd.startswith("s in ") and self._random.random() < self.drop_routes:
+                    continue
+                reply = self.reply(cmd)
+                if cmd.startswith("s in ") and self._random.random() < self.drop_acks:
+                    reply = []
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                await self._send(writer, ([cmd] if self.echo else []) + reply)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _send(self, writer, lines, prompt=None):
+        payload = "".join(f"{line}\r\n" for line in lines).encode("ascii")
+        if self.prompt if prompt is None else prompt:
+            payload += b">"
+        if self.garbage:
+            cut = self._random.randrange(len(payload) + 1)
+            payload = payload[:cut] + GARBAGE + payload[cut:]
+        self.bytes_out += len(payload)
+        if not self.fragment:
+            writer.write(payload)
+            await writer.drain()
+            return
+        for start in range(0, len(payload), self.fragment):
+            writer.write(payload[start:start + self.fragment])
+            await writer.drain()
+            await asyncio.sleep(0)
+
+    # -----------------------
+    # Unsolicited status
+    # -----------------------
+
+    async def broadcast(self, lines):
+        """Send status lines to every connected client."""
+        for writer in list(self._writers):
+            await self._send(writer, lines, prompt=False)
+
+    async def front_panel_route(self, input_id, output_id):
+        """Route from the front panel and report it like a real unit."""
+        self.routes[output_id] = input_id
+        await self.broadcast([self._route_line(output_id)])
+
+    async def hot_plug(self, direction, port, connected):
+        """Plug or unplug an input or output cable."""
+        links = self.in_links if direction == "in" else self.out_links
+        links[port] = connected
+        await self.broadcast([self._link_line(direction, port)])
+
+    # -----------------------
+    # Protocol
+    # -----------------------
+
+    def reply(self, cmd):
+        """Return the reply lines for one command."""
+        body = cmd.rstrip("!").strip().lower()
+        for pattern, handler in self._handlers:
+            if match := pattern.fullmatch(body):
+                return handler(*(int(g) if g.isdigit() else g for g in match.groups()))
+        return ["Command error"]
+
+    def _ports(self, port, count):
+        return range(1, count + 1) if port == 0 else [port]
+
+    def _route_line(self, output_id):
+        return f"input {self.routes[output_id]} -> output {output_id}"
+
+    def _link_line(self, direction, port):
+        links = self.in_links if direction == "in" else self.out_links
+        name = "input" if direction == "in" else "output"
+        return f"hdmi {name} {port}: {'connect' if links[port] else 'disconnect'}"
+
+    def _type(self):
+        return [self.model]
+
+    def _get_power(self):
+        return [f"power {'on' if self.power else 'off'}"]
+
+    def _set_power(self, state):
+        self.power = bool(state)
+        return self._get_power()
+
+    def _get_route(self, output_id):
+        return [self._route_line(out) for out in self._ports(output_id, self.outputs)]
+
+    def _set_route(self, input_id, output_id):
+        if not (1 <= input_id <= self.inputs and 1 <= output_id <= self.outputs):
+            return ["Command error"]
+        self.routes[output_id] = input_id
+        return [self._route_line(output_id)]
+
+    def _get_in_link(self, port):
+        return [self._link_line("in", p) for p in self._ports(port, self.inputs)]
+
+    def _get_out_link(self, port):
+        return [self._link_line("out", p) for p in self._ports(port, self.outputs)]
+
+    def _cec_in(self, port, command):
+        return [f"cec input {port} {command}"]
+
+    def _cec_out(self, port, command):
+        return [f"cec hdmi output {port} {command}"]
+
+
+async def _serve(args):
+    sim = OreiMatrixSimulator(
+        inputs=args.inputs,
+        outputs=args.outputs,
+        echo=args.echo,
+        prompt=args.prompt,
+        delay=args.delay,
+        fragment=args.fragment,
+        garbage=args.garbage,
+        drop_routes=args.drop_routes,
+        drop_acks=args.drop_acks,
+    )
+    port = await sim.start(args.host, args.port)
+    print(f"Simulating {sim.model} on {args.host}:{port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Orei HDMI matrix Telnet simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2323)
+    parser.add_argument("--inputs", type=int, default=4)
+    parser.add_argument("--outputs", type=int, default=4)
+    parser.add_argument("--echo", action="store_true")
+    parser.add_argument("--prompt", action="store_true")
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--fragment", type=int, default=0)
+    parser.add_argument("--garbage", action="store_true")
+    parser.add_argument("--drop-routes", type=float, default=0.0)
+    parser.add_argument("--drop-acks", type=float, default=0.0)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
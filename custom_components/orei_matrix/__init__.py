@@ -1,69 +1,391 @@
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from datetime import timedelta
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID, ATTR_DEVICE_ID, ATTR_ENTITY_ID
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.storage import Store
+import voluptuous as vol
+import asyncio
 import logging
+import time
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_PUSH,
+    CONF_SCENES,
+    CONF_STATS,
+    CONF_SOURCES,
+    CONF_ZONES,
+    SERVICE_REFRESH,
+    SERVICE_APPLY_SCENE,
+    SERVICE_SAVE_SCENE,
+    SERVICE_SET_POWER,
+    SERVICE_FOLLOW_INPUT,
+    SERVICE_CEC,
+    SERVICE_RECORD_TRAFFIC,
+    ATTR_SCENE,
+    ATTR_ROUTES,
+    ATTR_POWER,
+    ATTR_FROM_SOURCE,
+    ATTR_TO_SOURCE,
+    ATTR_COMMAND,
+    ATTR_INPUTS,
+    ATTR_OUTPUTS,
+    ATTR_SOURCES_OF,
+    ATTR_DURATION,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    TRACE_FILENAME,
+)
+from . import snapshot
 from .coordinator import OreiMatrixClient
+from .manager import OreiMatrixManager
+from .update_coordinator import OreiMatrixCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = ["media_player", "switch", "button"]
+PLATFORMS = ["media_player", "switch", "button", "binary_sensor", "sensor"]
+
+# Every service can target matrices by config entry, device or entity
+TARGET_FIELDS = {
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+}
+
+REFRESH_SCHEMA = vol.Schema(TARGET_FIELDS)
+
+SET_POWER_SCHEMA = vol.Schema({
+    vol.Required(ATTR_POWER): cv.boolean,
+    **TARGET_FIELDS,
+})
+
+APPLY_SCENE_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Exclusive(ATTR_SCENE, "scene"): cv.string,
+        vol.Exclusive(ATTR_ROUTES, "scene"): {cv.string: vol.Any(int, cv.string)},
+        **TARGET_FIELDS,
+    }),
+    cv.has_at_least_one_key(ATTR_SCENE, ATTR_ROUTES),
+)
+
+FOLLOW_INPUT_SCHEMA = vol.Schema({
+    vol.Required(ATTR_FROM_SOURCE): vol.Any(int, cv.string),
+    vol.Required(ATTR_TO_SOURCE): vol.Any(int, cv.string),
+    **TARGET_FIELDS,
+})
+
+_PORTS = vol.All(cv.ensure_list, [vol.Any(int, cv.string)])
+
+CEC_SCHEMA = vol.All(
+    cv.has_at_least_one_key(ATTR_INPUTS, ATTR_OUTPUTS, ATTR_SOURCES_OF),
+    vol.Schema({
+        # Passed to the matrix verbatim, e.g. on, off, mute, vol+, play
+        vol.Required(ATTR_COMMAND): vol.All(cv.string, vol.Lower, vol.Match(r"^[a-z0-9+\-]+$")),
+        vol.Optional(ATTR_INPUTS, default=[]): _PORTS,
+        vol.Optional(ATTR_OUTPUTS, default=[]): _PORTS,
+        vol.Optional(ATTR_SOURCES_OF, default=[]): _PORTS,
+        **TARGET_FIELDS,
+    }),
+)
+
+RECORD_TRAFFIC_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DURATION, default=60): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+    **TARGET_FIELDS,
+})
+
+SAVE_SCENE_SCHEMA = vol.Schema({
+    vol.Required(ATTR_SCENE): cv.string,
+    **TARGET_FIELDS,
+})
+
+
+def _resolve_port(names, value, what):
+    """Turn a 1-based port number or a configured name into a port number."""
+    if isinstance(value, int) or str(value).isdigit():
+        return int(value)
+    if value in names:
+        return names.index(value) + 1
+    raise HomeAssistantError(f"Unknown {what}: {value}")
+
+
+def _route_response(results):
+    """Service response for routing calls.
+
+    `results` maps entry ids to (routes, {output: success}); the response
+    lists the routes that were changed and, separately, those the matrix
+    did not take, as {entry_id: {output: input}}.
+    """
+    changed, failed = {}, {}
+    for entry_id, (routes, outcome) in results.items():
+        changed[entry_id] = {str(out): routes[out] for out, ok in outcome.items() if ok}
+        if not_taken := {str(out): routes[out] for out, ok in outcome.items() if not ok}:
+            failed[entry_id] = not_taken
+    return {"changed": changed, "failed": failed}
+
+
+def _resolve_routes(config, routes):
+    """Turn {zone: source} (names or numbers) into {output_id: input_id}."""
+    zones = config.get(CONF_ZONES, [])
+    sources = config.get(CONF_SOURCES, [])
+    return {
+        _resolve_port(zones, out, "zone"): _resolve_port(sources, inp, "source")
+        for out, inp in routes.items()
+    }
+
+
+def _settings(entry: ConfigEntry) -> dict:
+    """Push mode and statistics, as set up or as changed in the options since."""
+    config = {**entry.data, **entry.options}
+    return {key: config.get(key, False) for key in (CONF_PUSH, CONF_STATS)}
+
+
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry):
+    """Reload to apply switched push mode or statistics; saved scenes need none."""
+    data = hass.data[DOMAIN].entries.get(entry.entry_id)
+    if data is None or data["settings"] != _settings(entry):
+        await hass.config_entries.async_reload(entry.entry_id)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
-    client = OreiMatrixClient(entry.data["host"], entry.data.get("port", 23))
-    type_str = await client.get_type()
+    settings = _settings(entry)
+    client = OreiMatrixClient(
+        entry.data["host"], entry.data.get("port", 23), stats=settings[CONF_STATS]
+    )
+    store = Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry_id=entry.entry_id))
+    restored = snapshot.load(await store.async_load())
 
-    async def async_update_data():
-        try:
-            power = await client.get_power()
-            outputs = await client.get_output_sources()
-            return {
-                "power": power,
-                "type": type_str,
-                "outputs": outputs
-            }
-        except Exception as err:
-            _LOGGER.error("Update failed: %s", err)
-            raise UpdateFailed(err)
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="orei_matrix",
-        update_method=async_update_data,
-        update_interval=timedelta(seconds=30),
+    coordinator = OreiMatrixCoordinator(
+        hass, client, push=settings[CONF_PUSH], restored=restored
     )
 
-    await coordinator.async_config_entry_first_refresh()
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+    if restored:
+        # Start from the last-known state; the matrix may be slow or asleep
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await coordinator.async_shutdown()
+            await client.disconnect()
+            raise
+
+    @callback
+    def save_snapshot():
+        if coordinator.data:
+            store.async_delay_save(lambda: snapshot.dump(coordinator.data), STORAGE_SAVE_DELAY)
+
+    entry.async_on_unload(coordinator.async_add_listener(save_snapshot))
+
+    if settings[CONF_PUSH]:
+        client.set_push_listener(coordinator.async_handle_status)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
+    manager = hass.data.get(DOMAIN)
+    if manager is None:
+        manager = hass.data[DOMAIN] = OreiMatrixManager(hass)
+        _async_register_services(hass, manager)
+    manager.add(entry.entry_id, {
+        "entry": entry,
         "client": client,
         "coordinator": coordinator,
+        "store": store,
         "config": entry.data,
-    }
+        "settings": settings,
+    })
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    return True
+
 
-    data = hass.data[DOMAIN][entry.entry_id]
-    coordinator = data["coordinator"]
+def _async_register_services(hass: HomeAssistant, manager: OreiMatrixManager):
+    """Register the domain services once, for all matrices."""
 
     async def handle_refresh_service(call: ServiceCall):
         """Handle manual refresh of all states."""
-        await coordinator.async_request_refresh()
+        targets = manager.targets(call)
+        results = await manager.async_run(
+            targets, lambda data: data["coordinator"].async_refresh_all()
+        )
+        manager.raise_for_errors(results, targets)
+
+    async def handle_set_power(call: ServiceCall):
+        """Switch the targeted matrices on or off."""
+        targets = manager.targets(call)
+        results = await manager.async_run(
+            targets, lambda data: data["coordinator"].async_set_power(call.data[ATTR_POWER])
+        )
+        manager.raise_for_errors(results, targets)
+
+    async def handle_apply_scene(call: ServiceCall):
+        """Apply a stored scene or an explicit routing map."""
 
-    # Register the service
+        async def apply(data):
+            scenes = data["entry"].options.get(CONF_SCENES, {})
+            if ATTR_SCENE in call.data:
+                if call.data[ATTR_SCENE] not in scenes:
+                    return None
+                routes = scenes[call.data[ATTR_SCENE]]
+            else:
+                routes = call.data[ATTR_ROUTES]
+            routes = _resolve_routes(data["config"], routes)
+            return routes, await data["coordinator"].async_apply_routes(routes)
+
+        targets = manager.targets(call)
+        results = await manager.async_run(targets, apply)
+        manager.raise_for_errors(results, targets)
+        results = {entry_id: result for entry_id, result in results.items() if result is not None}
+        if ATTR_SCENE in call.data and not results:
+            raise HomeAssistantError(f"Unknown scene: {call.data[ATTR_SCENE]}")
+        return _route_response(results)
+
+    async def handle_follow_input(call: ServiceCall):
+        """Move every output showing one source to another source."""
+
+        async def follow(data):
+            sources = data["config"].get(CONF_SOURCES, [])
+            to_input = _resolve_port(sources, call.data[ATTR_TO_SOURCE], "source")
+            results = await data["coordinator"].async_follow_input(
+                _resolve_port(sources, call.data[ATTR_FROM_SOURCE], "source"), to_input
+            )
+            return dict.fromkeys(results, to_input), results
+
+        targets = manager.targets(call)
+        results = await manager.async_run(targets, follow)
+        manager.raise_for_errors(results, targets)
+        return _route_response(results)
+
+    async def handle_cec(call: ServiceCall):
+        """Send a CEC command to many sources and displays at once."""
+
+        async def send(data):
+            sources = data["config"].get(CONF_SOURCES, [])
+            zones = data["config"].get(CONF_ZONES, [])
+            return await data["coordinator"].async_send_cec(
+                call.data[ATTR_COMMAND],
+                inputs=[_resolve_port(sources, v, "source") for v in call.data[ATTR_INPUTS]],
+                outputs=[_resolve_port(zones, v, "zone") for v in call.data[ATTR_OUTPUTS]],
+                sources_of=[_resolve_port(zones, v, "zone") for v in call.data[ATTR_SOURCES_OF]],
+            )
+
+        targets = manager.targets(call)
+        results = await manager.async_run(targets, send)
+        manager.raise_for_errors(results, targets)
+        return {"results": results}
+
+    async def handle_record_traffic(call: ServiceCall):
+        """Record the raw Telnet traffic for a while and save it as a trace."""
+        results = {}
+        for entry_id, data in manager.targets(call).items():
+            client = data["client"]
+            path = hass.config.path(TRACE_FILENAME.format(
+                host=data["config"]["host"].replace(":", "_"),
+                timestamp=time.strftime("%Y%m%d-%H%M%S"),
+            ))
+
+            async def record(client=client, path=path):
+                recorder = client.start_recording()
+                try:
+                    await asyncio.sleep(call.data[ATTR_DURATION])
+                finally:
+                    if client.recorder is recorder:
+                        client.stop_recording()
+                await hass.async_add_executor_job(recorder.save, path)
+                _LOGGER.info("Saved Orei Matrix traffic trace to %s", path)
+
+            data["entry"].async_create_background_task(hass, record(), f"{DOMAIN} record traffic")
+            results[entry_id] = {"path": path}
+        return {"results": results}
+
+    async def handle_save_scene(call: ServiceCall):
+        """Store the current routing as a scene."""
+        for data in manager.targets(call).values():
+            outputs = data["coordinator"].routing.routes
+            config_entry = data["entry"]
+            scenes = {
+                **config_entry.options.get(CONF_SCENES, {}),
+                call.data[ATTR_SCENE]: {str(out): inp for out, inp in outputs.items()},
+            }
+            hass.config_entries.async_update_entry(
+                config_entry, options={**config_entry.options, CONF_SCENES: scenes}
+            )
+
+    # Register the services
     hass.services.async_register(
         DOMAIN,
-        "refresh",
+        SERVICE_REFRESH,
         handle_refresh_service,
-        schema=None,
+        schema=REFRESH_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_POWER,
+        handle_set_power,
+        schema=SET_POWER_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_SCENE,
+        handle_apply_scene,
+        schema=APPLY_SCENE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FOLLOW_INPUT,
+        handle_follow_input,
+        schema=FOLLOW_INPUT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CEC,
+        handle_cec,
+        schema=CEC_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_TRAFFIC,
+        handle_record_traffic,
+        schema=RECORD_TRAFFIC_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SAVE_SCENE,
+        handle_save_scene,
+        schema=SAVE_SCENE_SCHEMA,
     )
 
-    return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unloaded:
-        hass.data[DOMAIN].pop(entry.entry_id)
-    return unloaded
\ No newline at end of file
+        manager = hass.data[DOMAIN]
+        coordinator = manager.entries[entry.entry_id]["coordinator"]
+        if coordinator.data:
+            await manager.entries[entry.entry_id]["store"].async_save(snapshot.dump(coordinator.data))
+        await manager.async_remove(entry.entry_id)
+        if not manager.entries:
+            # Last matrix gone: remove the domain services with it
+            for service in (
+                SERVICE_REFRESH,
+                SERVICE_SET_POWER,
+                SERVICE_APPLY_SCENE,
+                SERVICE_FOLLOW_INPUT,
+                SERVICE_CEC,
+                SERVICE_RECORD_TRAFFIC,
+                SERVICE_SAVE_SCENE,
+            ):
+                hass.services.async_remove(DOMAIN, service)
+            hass.data.pop(DOMAIN)
+    return unloaded
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Delete the persisted state of a removed entry."""
+    await Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry_id=entry.entry_id)).async_remove()
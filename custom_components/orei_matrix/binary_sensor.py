@@ -0,0 +1,90 @@
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .const import DOMAIN
+from .diff import link_context
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up Orei HDMI Matrix input and output link sensors."""
+    data = hass.data[DOMAIN].entries[entry.entry_id]
+    coordinator = data["coordinator"]
+    config = data["config"]
+    sources = config.get("sources", [])
+    zones = config.get("zones", [])
+
+    # Ports the matrix reported in its bulk link queries, else as many as
+    # the last snapshot saw, else the configured ones
+    routing = coordinator.routing
+    counts = coordinator.data or {}
+    inputs = sorted(routing.links("in") or range(1, (counts.get("inputs") or len(sources)) + 1))
+    outputs = sorted(routing.links("out") or range(1, (counts.get("outputs") or len(zones)) + 1))
+
+    def port_name(names, port, fallback):
+        return names[port - 1] if port <= len(names) else f"{fallback} {port}"
+
+    entities = [
+        OreiMatrixLinkSensor(coordinator, config, "in", port, port_name(sources, port, "Input"), entry.entry_id)
+        for port in inputs
+    ] + [
+        OreiMatrixLinkSensor(coordinator, config, "out", port, port_name(zones, port, "Output"), entry.entry_id)
+        for port in outputs
+    ]
+
+    async_add_entities(entities)
+
+
+class OreiMatrixLinkSensor(CoordinatorEntity, BinarySensorEntity):
+    """HDMI hot-plug state of one input or output.
+
+    Fed by the coordinator's bulk link queries only; never polls its port.
+    """
+
+    _attr_device_class = BinarySensorDeviceClass.PLUG
+
+    def __init__(self, coordinator, config, direction, port, name, entry_id):
+        super().__init__(coordinator, context=link_context(direction, port))
+        self._config = config
+        self._direction = direction
+        self._port = port
+        self._entry_id = entry_id
+        self._attr_name = f"{name} {'source' if direction == 'in' else 'display'} connected"
+        self._attr_unique_id = f"{DOMAIN}_{config.get('host')}_{direction}_{port}_link"
+        self._written = None
+
+    @property
+    def device_info(self):
+        """Device info for grouping and model-based naming."""
+        model = self.coordinator.data.get("type", "Unknown")
+        name = f"Orei {model}" if model != "Unknown" else "Orei HDMI Matrix"
+        return {
+            "identifiers": {(DOMAIN, self._entry_id)},
+            "name": name,
+            "manufacturer": "Orei",
+            "model": model,
+            "configuration_url": f"http://{self._config.get('host')}",
+        }
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._written = (self.available, self.is_on)
+
+    @property
+    def available(self):
+        """Links are not polled while the matrix is off."""
+        return super().available and bool(self.coordinator.data.get("power"))
+
+    @property
+    def is_on(self):
+        return self.coordinator.routing.link(self._direction, self._port)
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write state only when the link or its availability changed."""
+        state = (self.available, self.is_on)
+        if state != self._written:
+            self._written = state
+            self.async_write_ha_state()
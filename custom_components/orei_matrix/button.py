@@ -1,14 +1,14 @@
 from homeassistant.components.button import ButtonEntity
-from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import DOMAIN
+from .diff import MATRIX
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Orei HDMI Matrix outputs as buttons."""
-    data = hass.data[DOMAIN][entry.entry_id]
+    data = hass.data[DOMAIN].entries[entry.entry_id]
     client = data["client"]
     coordinator = data["coordinator"]
     config = data["config"]
@@ -25,14 +25,14 @@ class OreiMatrixOutputButton(CoordinatorEntity, ButtonEntity):
     """Represents one HDMI matrix output as a button to cycle sources."""
 
     def __init__(self, client, coordinator, config, name, output_id, entry_id):
-        super().__init__(coordinator)
+        # A button has no state of its own; it only follows availability
+        super().__init__(coordinator, context=MATRIX)
         sources = config.get("sources", [])
         self._client = client
         self._config = config
         self._attr_name = name
         self._output_id = output_id
         self._sources = sources
-        self._current = None
         self._entry_id = entry_id
         self._attr_unique_id = f"{DOMAIN}_{config.get('host')}_{output_id}_next_source"
 
@@ -48,23 +48,15 @@ class OreiMatrixOutputButton(CoordinatorEntity, ButtonEntity):
             "model": model,
             "configuration_url": f"http://{self._config.get('host')}",
         }
-        
-    @callback
-    def _handle_coordinator_update(self):
-        outputs = self.coordinator.data.get("outputs")
-        if not outputs:
-            return
-        self._current = outputs[self._output_id]
-        self.async_write_ha_state()
-    
+
     async def async_press(self) -> None:
         """Handle the button press."""
-        if self._current == None:
+        current = self.coordinator.routing.source(self._output_id)
+        if current is None:
             _LOGGER.warning("Current input is unknown; cannot change source for %s.", self.name)
             return
-        
-        input_id = (self._current % len(self._sources)) + 1
+
+        input_id = (current % len(self._sources)) + 1
         source = self._sources[input_id - 1]
-        await self._client.set_output_source(input_id, self._output_id)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_output_source(input_id, self._output_id)
         _LOGGER.info("Switched %s to %s", self.name, source)
\ No newline at end of file
@@ -1,36 +1,145 @@
 from homeassistant import config_entries
+from homeassistant.components import network
+from homeassistant.core import callback
 import voluptuous as vol
 from homeassistant.helpers.selector import selector
 
-from .const import DOMAIN, CONF_HOST, CONF_PORT, CONF_SOURCES, CONF_ZONES
+from .const import DOMAIN, CONF_HOST, CONF_PORT, CONF_SOURCES, CONF_ZONES, CONF_PUSH, CONF_STATS, DEFAULT_PORT
+from . import discovery
+
+# Choice in the discovered-devices list that leads to manual entry
+MANUAL = "manual"
+
+
+async def _async_local_networks(hass):
+    """IPv4 networks of the enabled network adapters, as "address/prefix"."""
+    networks = []
+    for adapter in await network.async_get_adapters(hass):
+        if not adapter["enabled"]:
+            continue
+        for ipv4 in adapter["ipv4"]:
+            if not ipv4["address"].startswith("127."):
+                networks.append(f"{ipv4['address']}/{ipv4['network_prefix']}")
+    return networks
 
 
 class OreiMatrixConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
-    """Handle Orei HDMI Matrix config flow."""
+    """Handle Orei HDMI Matrix config flow.
+
+    Scans the local networks for matrices first; the one picked (or one
+    entered by hand and probed) pre-fills the port counts and names.
+    """
 
     VERSION = 1
 
+    def __init__(self):
+        self._discovered = {}
+        self._device = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return OreiMatrixOptionsFlow()
+
+    def _configured_hosts(self):
+        return {entry.data.get(CONF_HOST) for entry in self._async_current_entries()}
+
     async def async_step_user(self, user_input=None):
         if user_input is not None:
+            if user_input[CONF_HOST] == MANUAL:
+                return await self.async_step_manual()
+            self._device = self._discovered[user_input[CONF_HOST]]
+            return await self.async_step_configure()
+
+        found = await discovery.scan(
+            await _async_local_networks(self.hass), DEFAULT_PORT, skip=self._configured_hosts()
+        )
+        self._discovered = {device.host: device for device in found}
+        if not self._discovered:
+            return await self.async_step_manual()
+
+        choices = {
+            host: f"{device.model} ({host}, {device.inputs}x{device.outputs})"
+            for host, device in sorted(self._discovered.items())
+        }
+        choices[MANUAL] = "Enter address manually"
+        return self.async_show_form(
+            step_id="user",
+            data_schema=vol.Schema({vol.Required(CONF_HOST): vol.In(choices)}),
+        )
+
+    async def async_step_manual(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            self._async_abort_entries_match({CONF_HOST: user_input[CONF_HOST]})
+            self._device = await discovery.probe(
+                user_input[CONF_HOST], user_input[CONF_PORT], connect_timeout=discovery.PROBE_TIMEOUT
+            )
+            if self._device is not None:
+                return await self.async_step_configure()
+            errors["base"] = "cannot_connect"
+
+        return self.async_show_form(
+            step_id="manual",
+            data_schema=vol.Schema({
+                vol.Required(CONF_HOST, default=(user_input or {}).get(CONF_HOST, "")): str,
+                vol.Optional(CONF_PORT, default=DEFAULT_PORT): int,
+            }),
+            errors=errors,
+        )
+
+    async def async_step_configure(self, user_input=None):
+        device = self._device
+        if user_input is not None:
+            self._async_abort_entries_match({CONF_HOST: device.host})
             return self.async_create_entry(
-                title=f"Orei HDMI Matrix ({user_input.get('host')})",
-                data=user_input,
+                title=f"Orei HDMI Matrix ({device.host})",
+                data={CONF_HOST: device.host, CONF_PORT: device.port, **user_input},
             )
 
         data_schema = vol.Schema({
-            vol.Required(CONF_HOST): str,
-            vol.Optional(CONF_PORT, default=23): int,
             vol.Optional(
                 CONF_SOURCES,
-                default=[]
+                default=[f"Input {port}" for port in range(1, device.inputs + 1)]
             ): selector({"text": {"multiple": True}}),
             vol.Optional(
                 CONF_ZONES,
-                default=[]
+                default=[f"Output {port}" for port in range(1, device.outputs + 1)]
             ): selector({"text": {"multiple": True}}),
+            vol.Optional(CONF_PUSH, default=False): bool,
+            vol.Optional(CONF_STATS, default=False): bool,
         })
 
         return self.async_show_form(
-            step_id="user",
+            step_id="configure",
             data_schema=data_schema,
-        )
\ No newline at end of file
+            description_placeholders={
+                "model": device.model,
+                "host": device.host,
+                "inputs": str(device.inputs),
+                "outputs": str(device.outputs),
+            },
+        )
+
+
+class OreiMatrixOptionsFlow(config_entries.OptionsFlow):
+    """Switch push mode and connection statistics on an existing entry.
+
+    Entries created before these settings existed get them here; changing
+    either reloads the entry.
+    """
+
+    async def async_step_init(self, user_input=None):
+        entry = self.config_entry
+        if user_input is not None:
+            # Saved scenes live in the options too
+            return self.async_create_entry(title="", data={**entry.options, **user_input})
+
+        current = {**entry.data, **entry.options}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_PUSH, default=current.get(CONF_PUSH, False)): bool,
+                vol.Optional(CONF_STATS, default=current.get(CONF_STATS, False)): bool,
+            }),
+        )
@@ -4,6 +4,54 @@ CONF_HOST = "host"
 CONF_PORT = "port"
 CONF_SOURCES = "sources"
 CONF_ZONES = "zones"
+CONF_PUSH = "push"
+CONF_SCENES = "scenes"
+CONF_STATS = "stats"
+
+SERVICE_REFRESH = "refresh"
+SERVICE_APPLY_SCENE = "apply_scene"
+SERVICE_SAVE_SCENE = "save_scene"
+SERVICE_SET_POWER = "set_power"
+SERVICE_FOLLOW_INPUT = "follow_input"
+SERVICE_CEC = "cec"
+SERVICE_RECORD_TRAFFIC = "record_traffic"
+
+ATTR_SCENE = "scene"
+ATTR_ROUTES = "routes"
+ATTR_POWER = "power"
+ATTR_FROM_SOURCE = "from_source"
+ATTR_TO_SOURCE = "to_source"
+ATTR_COMMAND = "command"
+ATTR_INPUTS = "inputs"
+ATTR_OUTPUTS = "outputs"
+ATTR_SOURCES_OF = "sources_of"
+ATTR_DURATION = "duration"
+
+# Last-known state, persisted per config entry for instant startup
+STORAGE_VERSION = 1
+STORAGE_KEY = "orei_matrix.{entry_id}"
+# Coalesce state saves; routing can change many times in a few seconds
+STORAGE_SAVE_DELAY = 10
+
+# Traffic recordings are written to the config directory under this name
+TRACE_FILENAME = "orei_matrix_{host}_{timestamp}.trace"
+
+# Cross-matrix services talk to at most this many matrices at once
+MAX_PARALLEL_MATRICES = 4
 
 DEFAULT_PORT = 23
-DEFAULT_NAME = "Orei HDMI Matrix"
\ No newline at end of file
+DEFAULT_NAME = "Orei HDMI Matrix"
+
+# Polling tiers: seconds between queries while busy, normally and when idle
+POLL_TIERS = {
+    "power": (5, 30, 120),
+    "outputs": (5, 30, 120),
+    "in_links": (10, 60, 300),
+    "out_links": (10, 60, 300),
+}
+# Poll at the busy rate for this long after a command or detected change
+POLL_BURST_DURATION = 60
+# Switch to the idle rate after this long without any change
+POLL_IDLE_AFTER = 600
+# Slower reconciliation interval used for every tier in push mode
+PUSH_RECONCILE_INTERVAL = 300
\ No newline at end of file
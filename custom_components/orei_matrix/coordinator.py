@@ -1,35 +1,205 @@
 import asyncio
 import logging
+from contextlib import aclosing
+import random
+import re
+import socket
+
+from .parser import Route, Link, LineBuffer, command_kind, is_noise, parse_line
+from .scheduler import (
+    PRIORITY_NAMES,
+    PRIORITY_POLL,
+    PRIORITY_WRITE,
+    CommandQueue,
+    read_priority,
+)
+from .recorder import TrafficRecorder
+from .stats import ClientStats
 
 _LOGGER = logging.getLogger(__name__)
 
+# Fallback: stop reading once the matrix has been silent for this long.
+IDLE_TIMEOUT = 0.3
+# Upper bound for a single command's response.
+RESPONSE_TIMEOUT = 2.0
+# Writes queued within this window are coalesced and sent in one batch.
+BATCH_WINDOW = 0.01
+# Identical reads within this many seconds are answered from cache.
+CACHE_TTL = 1.0
+
+# Give up on a TCP connect after this long.
+CONNECT_TIMEOUT = 5.0
+# Probe the matrix when the connection has been idle this long.
+KEEPALIVE_INTERVAL = 60
+# Background reconnect backoff: first delay, cap, and the number of failed
+# attempts after which the circuit opens and commands fail fast.
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 60.0
+BREAKER_THRESHOLD = 3
+
+# Rounds of re-sending routes that neither acknowledged nor show up in the
+# confirmation read, after the first attempt
+ROUTE_RETRIES = 2
+
+# Connection states reported to state listeners
+STATE_DISCONNECTED = "disconnected"
+STATE_CONNECTED = "connected"
+STATE_BACKING_OFF = "backing_off"
+STATE_OPEN = "open"
+
+# Commands that always answer with exactly one data line.
+_SINGLE_LINE_COMMANDS = [
+    re.compile(r"^r type!$"),
+    re.compile(r"^r power!$"),
+    re.compile(r"^r av out [1-9]\d*!$"),
+    re.compile(r"^r link (in|out) [1-9]\d*!$"),
+    re.compile(r"^s in \d+ av out \d+!$"),
+]
+
+# Bulk queries answer with one line per port; the count is learned from the
+# first reply.
+_BULK_QUERIES = ("r av out 0!", "r link in 0!", "r link out 0!")
+
+# CEC commands: how (and whether) the matrix acknowledges them varies by
+# firmware, so the ack line count is learned from the first one that gets a
+# reply and applies to all of them.
+_CEC_COMMAND = re.compile(r"^s cec (in|hdmi out) \d+ \S+!$")
+
+# Commands answered about one port: direction ("in"/"out", None for
+# routes) and port, 0 for all of them.
+_PORT_COMMAND = re.compile(r"^(?:r av out|s in \d+ av out|r link (in|out)) (\d+)!$")
+
+
+class OreiMatrixUnavailable(ConnectionError):
+    """Raised without touching the network while the matrix is unreachable."""
+
+
 class OreiMatrixClient:
     """Async client for controlling Orei HDMI Matrix via Telnet."""
 
-    def __init__(self, host, port=23):
+    def __init__(
+        self,
+        host,
+        port=23,
+        batch_window=BATCH_WINDOW,
+        stats=False,
+        cache_ttl=CACHE_TTL,
+        connect_timeout=CONNECT_TIMEOUT,
+    ):
         self._host = host
         self._port = port
+        self._connect_timeout = connect_timeout
         self._reader = None
         self._writer = None
-        self._lock = asyncio.Lock()
+        # Serialises use of the connection, writes ahead of reads ahead of polls
+        self._queue = CommandQueue()
+        self._learned_lines = {}
+        self._rx = LineBuffer()
+        self._batch_window = batch_window
+        self._pending = {}
+        self._flush_handle = None
+        # Output -> route command of the batch on the wire whose reply has
+        # not been read yet, and command -> ack lines that arrived early
+        self._awaiting = {}
+        self._held = {}
+        # Output -> input of the route most recently queued for it
+        self._queued_routes = {}
+        # Read command -> in-flight task, and -> (expiry, response lines)
+        self._cache_ttl = cache_ttl
+        self._inflight = {}
+        self._cache = {}
+        # Bumped by every invalidation, so a streamed read can tell it is stale
+        self._generation = 0
+        # In-flight read task -> number of callers awaiting it
+        self._readers = {}
+        self._tasks = set()
+        self._push_listener = None
+        self._reader_task = None
+        self._rx_event = asyncio.Event()
+        self._busy = False
+        self._state = STATE_DISCONNECTED
+        self._state_listeners = []
+        # Set whenever the connection is settled: connected or circuit open
+        self._settled = asyncio.Event()
+        self._reconnect_task = None
+        self._keepalive_task = None
+        self._last_activity = 0.0
+        # Latency and traffic statistics; None unless enabled
+        self.stats = ClientStats() if stats else None
+        # Raw traffic recorder; None unless recording
+        self.recorder = None
 
     # -----------------------
     # Connection management
     # -----------------------
 
+    @property
+    def state(self) -> str:
+        """Connection state: connected, backing_off, open or disconnected."""
+        return self._state
+
+    def add_state_listener(self, listener):
+        """Call `listener(state)` on every connection state change.
+
+        Returns a function that removes the listener.
+        """
+        self._state_listeners.append(listener)
+        return lambda: self._state_listeners.remove(listener)
+
+    def _set_state(self, state: str):
+        if state == self._state:
+            return
+        _LOGGER.debug("Orei Matrix connection state: %s -> %s", self._state, state)
+        self._state = state
+        if state == STATE_BACKING_OFF:
+            self._settled.clear()
+        else:
+            self._settled.set()
+        for listener in list(self._state_listeners):
+            try:
+                listener(state)
+            except Exception:
+                _LOGGER.exception("Error in connection state listener")
+
     async def connect(self):
         """Establish a TCP connection to the matrix."""
         try:
-            self._reader, self._writer = await asyncio.open_connection(
-                self._host, self._port
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self._host, self._port),
+                timeout=self._connect_timeout,
             )
             _LOGGER.debug("Connected to Orei Matrix at %s:%s", self._host, self._port)
         except Exception as e:
-            _LOGGER.error("Failed to connect to Orei Matrix: %s", e)
+            _LOGGER.debug("Failed to connect to Orei Matrix: %r", e)
+            if self.stats:
+                self.stats.connect_failures += 1
             raise
+        if self.recorder:
+            self.recorder.connected()
+        self._enable_tcp_keepalive()
+        self._rx.clear()
+        self._last_activity = asyncio.get_running_loop().time()
+        self._set_state(STATE_CONNECTED)
+        if self._push_listener:
+            self._start_reader()
+        if self._keepalive_task is None:
+            self._keepalive_task = asyncio.get_running_loop().create_task(self._keepalive_loop())
 
     async def disconnect(self):
-        """Close the connection."""
+        """Close the connection and stop reconnecting."""
+        task, self._reconnect_task = self._reconnect_task, None
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        await self._close()
+        self._set_state(STATE_DISCONNECTED)
+
+    async def _close(self):
+        """Close the socket and the tasks that use it."""
+        for name in ("_reader_task", "_keepalive_task"):
+            task = getattr(self, name)
+            setattr(self, name, None)
+            if task and task is not asyncio.current_task():
+                task.cancel()
         if self._writer:
             try:
                 self._writer.close()
@@ -38,76 +208,671 @@ class OreiMatrixClient:
                 pass
             self._reader = None
             self._writer = None
+            self._rx.clear()
+            self._invalidate()
             _LOGGER.debug("Disconnected from Orei Matrix")
 
     async def _ensure_connected(self):
-        """Reconnect if needed."""
-        if not self._writer or self._writer.is_closing():
+        """Reconnect if needed, or fail fast while the matrix is unreachable."""
+        if self._writer and not self._writer.is_closing():
+            return
+        if self._state == STATE_BACKING_OFF:
+            # A background reconnect is under way; wait for it to connect or
+            # for the circuit to open, whichever comes first
+            try:
+                await asyncio.wait_for(self._settled.wait(), timeout=self._connect_timeout)
+            except asyncio.TimeoutError:
+                pass
+            if self._state == STATE_CONNECTED:
+                return
+        if self._state in (STATE_BACKING_OFF, STATE_OPEN):
+            raise OreiMatrixUnavailable(
+                f"Orei Matrix at {self._host} is unreachable, retrying in the background"
+            )
+        try:
             await self.connect()
+        except Exception:
+            self._schedule_reconnect(failed_attempts=1)
+            raise
+
+    async def _connection_lost(self, err):
+        """Close a broken connection and reconnect in the background."""
+        if self._reconnect_task is None:
+            _LOGGER.warning("Lost connection to Orei Matrix (%s), reconnecting in the background", err)
+        await self._close()
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self, failed_attempts: int = 0):
+        if self._reconnect_task is None:
+            self._set_state(STATE_BACKING_OFF)
+            self._reconnect_task = asyncio.get_running_loop().create_task(
+                self._reconnect_loop(failed_attempts)
+            )
+
+    async def _reconnect_loop(self, failed_attempts: int):
+        """Reconnect with exponential backoff and jitter."""
+        try:
+            while True:
+                if failed_attempts:
+                    delay = min(BACKOFF_MAX, BACKOFF_INITIAL * 2 ** (failed_attempts - 1))
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                try:
+                    await self.connect()
+                    _LOGGER.info("Reconnected to Orei Matrix at %s", self._host)
+                    if self.stats:
+                        self.stats.reconnects += 1
+                    return
+                except Exception as e:
+                    failed_attempts += 1
+                    if failed_attempts == BREAKER_THRESHOLD:
+                        _LOGGER.warning(
+                            "Orei Matrix at %s unreachable (%s); failing commands until it is back",
+                            self._host, e,
+                        )
+                    if failed_attempts >= BREAKER_THRESHOLD:
+                        self._set_state(STATE_OPEN)
+        finally:
+            if self._reconnect_task is asyncio.current_task():
+                self._reconnect_task = None
+
+    def _enable_tcp_keepalive(self):
+        """Let the OS detect a dead peer on an otherwise idle socket."""
+        sock = self._writer.get_extra_info("socket")
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for option, value in (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+                if hasattr(socket, option):
+                    sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+        except OSError as e:
+            _LOGGER.debug("Could not enable TCP keepalive: %s", e)
+
+    async def _keepalive_loop(self):
+        """Send a cheap read when the connection has been idle for a while."""
+        loop = asyncio.get_running_loop()
+        read_priority.set(PRIORITY_POLL)
+        while True:
+            idle = loop.time() - self._last_activity
+            if idle < KEEPALIVE_INTERVAL:
+                await asyncio.sleep(KEEPALIVE_INTERVAL - idle)
+                continue
+            try:
+                await self.get_power()
+            except Exception:
+                # The failed command already started a reconnect
+                return
+
+    # -----------------------
+    # Traffic recording
+    # -----------------------
+
+    def start_recording(self) -> TrafficRecorder:
+        """Start recording the raw traffic, replacing any running recording."""
+        self.recorder = TrafficRecorder(self._host, self._port)
+        if self._writer and not self._writer.is_closing():
+            # Already connected: the trace starts mid-session
+            self.recorder.connected()
+        return self.recorder
+
+    def stop_recording(self):
+        """Stop recording and return the recorder, or None if not recording."""
+        recorder, self.recorder = self.recorder, None
+        return recorder
+
+    # -----------------------
+    # Push mode
+    # -----------------------
+
+    def set_push_listener(self, listener):
+        """Keep a background reader on the connection and report status lines.
+
+        `listener(record)` is called with a parser record (Route, Link or
+        Power) for every status line the matrix sends on its own (front
+        panel, IR remote, hot-plug). Pass None to stop listening.
+        """
+        self._push_listener = listener
+        if listener is None:
+            task, self._reader_task = self._reader_task, None
+            if task:
+                task.cancel()
+        elif self._writer and not self._writer.is_closing():
+            self._start_reader()
+
+    def _start_reader(self):
+        if self._reader_task is None:
+            self._reader_task = asyncio.get_running_loop().create_task(self._reader_loop())
+
+    async def _reader_loop(self):
+        """Own all socket reads while push mode is on."""
+        try:
+            while True:
+                data = await self._reader.read(1024)
+                if not data:
+                    break
+                self._received(data)
+                self._rx_event.set()
+                if not self._busy:
+                    self._dispatch_unsolicited()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _LOGGER.debug("Push reader stopped: %s", e)
+        self._rx_event.set()
+        await self._connection_lost("connection closed by the matrix")
+
+    def _dispatch_unsolicited(self):
+        """Hand buffered lines that belong to no command to the listener."""
+        while (line := self._take_line()) is not None:
+            self._notify(line)
+
+    def _notify(self, line: str, record=None):
+        record = record or (parse_line(line) if line else None)
+        if record is None:
+            return
+        _LOGGER.debug("Unsolicited status: %s", line)
+        if isinstance(record, Route):
+            self._invalidate("r av out")
+        elif isinstance(record, Link):
+            self._invalidate(f"r link {record.direction}")
+        else:
+            self._invalidate()
+        try:
+            self._push_listener(record)
+        except Exception:
+            _LOGGER.exception("Error handling status line: %s", line)
+
+    def _discard_stale(self):
+        """Drop (or, in push mode, dispatch) lines no command is waiting for."""
+        if self._reader_task:
+            self._dispatch_unsolicited()
+        else:
+            self._rx.clear()
+
+    def _late_line(self, line: str, record):
+        """Handle a status line that arrived during a reply it is no part of.
+
+        In push mode it is an unsolicited update. Otherwise it is most likely
+        the tail of an earlier reply that went quiet mid-way; it is dropped,
+        and if it belongs to a bulk query the line count learned for that
+        query is forgotten, as it was learned from the cut-short reply.
+        """
+        if self._reader_task:
+            self._notify(line, record)
+            return
+        _LOGGER.debug("Dropping late line: %s", line)
+        if isinstance(record, Route):
+            self._learned_lines.pop("r av out 0!", None)
+        elif isinstance(record, Link):
+            self._learned_lines.pop(f"r link {record.direction} 0!", None)
+
+    def _release(self):
+        """Mark the connection idle and pass on lines that arrived meanwhile."""
+        self._busy = False
+        if self._reader_task:
+            self._dispatch_unsolicited()
+
+    def _received(self, data: bytes):
+        self._rx.feed(data)
+        if self.stats:
+            self.stats.bytes_in += len(data)
+        if self.recorder and data:
+            self.recorder.received(data)
+
+    async def _fill_rx(self, timeout: float) -> bool:
+        """Wait for more bytes in the receive buffer; False on EOF."""
+        if self._reader_task is None:
+            data = await asyncio.wait_for(self._reader.read(1024), timeout=timeout)
+            self._received(data)
+            return bool(data)
+        self._rx_event.clear()
+        await asyncio.wait_for(self._rx_event.wait(), timeout=timeout)
+        return self._reader_task is not None
 
     # -----------------------
     # Core command handling
     # -----------------------
 
-    async def _send_command_multiple(self, cmd: str) -> list[str]:
-        async with self._lock:
-            await self._ensure_connected()
+    def _expected_lines(self, cmd: str):
+        """Return how many data lines `cmd` answers with, or None if unknown."""
+        if cmd in _BULK_QUERIES:
+            return self._learned_lines.get(cmd)
+        if _CEC_COMMAND.match(cmd):
+            return self._learned_lines.get("cec")
+        for pattern in _SINGLE_LINE_COMMANDS:
+            if pattern.match(cmd):
+                return 1
+        return None
 
-            try:
-                _LOGGER.debug("Sending command: %s", cmd)
-                self._writer.write((cmd + "\r\n").encode("ascii"))
-                await self._writer.drain()
+    def _take_line(self, flush: bool = False):
+        """Pop the next complete line from the receive buffer, or None."""
+        return self._rx.take(flush)
+
+    async def _iter_response(self, cmd: str, batch_deadline: float = None):
+        """Yield the response to `cmd` as it arrives.
+
+        Each reply line is parsed once, here: commands with a known response
+        type yield its records, others (CEC) the cleaned lines. A status line
+        of another type is an unsolicited update or a late tail (see
+        `_late_line`). A response is complete when the `>` prompt arrives after the reply or
+        when the expected number of data lines has been received. The idle
+        timeout only applies as a fallback for commands whose framing is not
+        known, or when the matrix stops talking mid-response. Lines beyond
+        the end of the response stay buffered for the next pipelined command.
 
-                # Read response until idle
-                chunks = bytearray()
+        The acks of pipelined routes are matched to their command by output.
+        The matrix answers in order, so an ack for a later route means this
+        one's was lost: it is kept for that route and this response ends.
+        Commands of one pipelined batch share `batch_deadline` for their
+        first byte; once it has passed, each waits only the idle timeout.
+        """
+        expected = self._expected_lines(cmd)
+        framed = expected is not None or cmd in _BULK_QUERIES
+        kind = command_kind(cmd)
+        target = _PORT_COMMAND.match(cmd)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + RESPONSE_TIMEOUT
+        count = 0
+        last_port = 0
+        talking = False
+        complete = False
+        # Ended by the matrix going quiet rather than by the deadline or EOF
+        quiet = False
+        # Ended by the ack of a later pipelined route
+        overtaken = False
+        held = self._held.pop(cmd, [])
+        if target and self._awaiting.get(int(target[2])) == cmd:
+            del self._awaiting[int(target[2])]
+
+        while not complete:
+            line = held.pop(0) if held else self._take_line()
+            if line is None:
+                now = loop.time()
+                remaining = deadline - now
+                if remaining <= 0:
+                    break
+                # Framed commands wait for the whole budget before the first
+                # byte; once the matrix is talking, stop after it goes quiet.
+                patience = remaining if batch_deadline is None else batch_deadline - now
+                idle = talking or self._rx or not framed or patience <= 0
+                timeout = min(IDLE_TIMEOUT, remaining) if idle else min(remaining, patience)
                 try:
-                    while True:
-                        data = await asyncio.wait_for(
-                            self._reader.read(1024), timeout=0.3
-                        )
-                        if not data:
-                            break
-                        chunks.extend(data)
+                    if not await self._fill_rx(timeout):
+                        break
                 except asyncio.TimeoutError:
-                    pass
+                    quiet = idle and timeout == IDLE_TIMEOUT
+                    break
+                continue
 
-                if not chunks:
-                    _LOGGER.warning("No response received for command: %s", cmd)
-                    return ""
-
-                # --- Clean and parse ---
-                filtered = bytes(b for b in chunks if b < 0x80)
-                text = filtered.decode("ascii", errors="ignore").strip()
-
-                # Split into lines, remove empty and banner/prompt lines
-                lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-                _LOGGER.debug("Parsed lines: %s", lines)
-
-                # Remove echoed command and banner
-                cleaned = []
-                for line in lines:
-                    if (
-                        line.startswith(cmd.split()[0]) or
-                        line.startswith("********") or
-                        line.startswith("FW Version") or
-                        line == ">" or
-                        "Welcome" in line
-                    ):
+            talking = True
+            if line == ">":
+                complete = bool(count)
+                continue
+            if not line or is_noise(line, cmd):
+                continue
+            record = None
+            if kind:
+                # Any line would pass for a model name, so status lines are
+                # told apart first; other types try their own pattern first
+                record = parse_line(line, kind) if kind != "type" else None
+                if record is None:
+                    if (status := parse_line(line)) is not None:
+                        self._late_line(line, status)
+                        expected = self._expected_lines(cmd)
                         continue
-                    cleaned.append(line.strip('>'))
+                    if kind == "type":
+                        record = parse_line(line, kind)
+            if target and record is not None:
+                direction, port = target[1], int(target[2])
+                status_direction, status_port = (
+                    (None, record.output) if isinstance(record, Route) else (record.direction, record.port)
+                )
+                # Bulk replies list every port from the first one on
+                expected_port = port or (1 if not last_port else None)
+                if isinstance(record, Route) and status_port != port and status_port in self._awaiting:
+                    self._held.setdefault(self._awaiting[status_port], []).append(line)
+                    overtaken = True
+                    break
+                if status_direction != direction or expected_port and status_port != expected_port:
+                    self._late_line(line, record)
+                    expected = self._expected_lines(cmd)
+                    continue
+                if not port and status_port <= last_port:
+                    # Ports are listed in order, so the reply started over:
+                    # the lines before it were the tail of an earlier one
+                    _LOGGER.debug("Late tail before the reply to %s", cmd)
+                    self._learned_lines.pop(cmd, None)
+                    expected = None
+                    count = 0
+                last_port = status_port
+            count += 1
+            complete = expected is not None and count >= expected
+            if not kind:
+                yield line.strip(">")
+            elif record is not None:
+                yield record
+
+        if self.stats:
+            self.stats.record("response", cmd, loop.time() - started)
+            if framed and not complete:
+                self.stats.timeouts += 1
+            if not count:
+                self.stats.empty_responses += 1
+
+        if not (complete or overtaken):
+            # Gave up waiting; whatever is left belongs to this command.
+            while (line := self._take_line(flush=True)) is not None:
+                if line and not is_noise(line, cmd):
+                    count += 1
+                    if not kind:
+                        yield line.strip(">")
+                    elif (record := parse_line(line, kind)) is not None:
+                        yield record
+                if not self._rx:
+                    break
 
-                return cleaned
+        if not count or not (complete or quiet):
+            # A reply cut off by the deadline or a dropped connection says
+            # nothing about how long a whole one is
+            return
+        if cmd in _BULK_QUERIES:
+            # Remember the line count so the next bulk query can finish as
+            # soon as its last line arrives. A reply that went quiet early
+            # may be short, so a learned count is only ever raised.
+            self._learned_lines[cmd] = max(count, self._learned_lines.get(cmd, 0))
+        elif "cec" not in self._learned_lines and _CEC_COMMAND.match(cmd):
+            self._learned_lines["cec"] = count
+
+    async def _read_response(self, cmd: str, batch_deadline: float = None) -> list:
+        """Read the whole response to `cmd`."""
+        async with aclosing(self._iter_response(cmd, batch_deadline)) as response:
+            lines = [line async for line in response]
+        _LOGGER.debug("Response to %s: %s", cmd, lines)
+        return lines
+
+    async def _write(self, cmds):
+        """Write one or more commands to the socket in a single write."""
+        _LOGGER.debug("Sending command(s): %s", cmds)
+        loop = asyncio.get_running_loop()
+        started = self._last_activity = loop.time()
+        payload = "".join(f"{cmd}\r\n" for cmd in cmds).encode("ascii")
+        if self.recorder:
+            self.recorder.sent(payload)
+        self._writer.write(payload)
+        await self._writer.drain()
+        if self.stats:
+            self.stats.commands += len(cmds)
+            self.stats.bytes_out += len(payload)
+            self.stats.record("write", cmds[0] if len(cmds) == 1 else "batch", loop.time() - started)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of commands or batches waiting for the connection."""
+        return self._queue.depth
+
+    def _slot_acquired(self, priority: int, started: float):
+        if self.stats:
+            self.stats.record(
+                "queue_wait", PRIORITY_NAMES[priority], asyncio.get_running_loop().time() - started
+            )
+            self.stats.queue_depth = self._queue.depth
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, self._queue.depth)
+
+    async def _exchange(self, cmd: str, priority: int = None, tag=None):
+        """Send one command and yield its response lines as they arrive.
+
+        Holds the connection until the generator is exhausted or closed, so
+        consume it under `aclosing()`. `tag` (the current task by default)
+        identifies the queued command for `CommandQueue.promote`.
+        """
+        if priority is None:
+            priority = read_priority.get()
+        started = asyncio.get_running_loop().time()
+        async with self._queue.slot(priority, tag or asyncio.current_task()):
+            self._slot_acquired(priority, started)
+            await self._ensure_connected()
+
+            try:
+                # Anything still buffered is a leftover from an earlier reply.
+                self._discard_stale()
+                self._busy = True
+                await self._write([cmd])
+
+                received = False
+                async with aclosing(self._iter_response(cmd)) as response:
+                    async for line in response:
+                        received = True
+                        try:
+                            yield line
+                        except GeneratorExit:
+                            # The caller stopped early; read the rest of the
+                            # reply so it is not taken for the next one's
+                            async for _ in response:
+                                pass
+                            raise
+                if not received:
+                    _LOGGER.warning("No response received for command: %s", cmd)
 
             except Exception as e:
                 _LOGGER.warning("Telnet command failed (%s), reconnecting...", e)
-                await self.disconnect()
+                await self._connection_lost(e)
                 raise
-    
-    async def _send_command(self, cmd: str) -> str:
-        cleaned = await self._send_command_multiple(cmd);
-        response = cleaned[-1] if cleaned else ""
-        _LOGGER.debug("Cleaned response: %s", response)
-        return response
+            finally:
+                self._release()
+
+    async def _send_command_multiple(self, cmd: str, priority: int = None) -> list:
+        async with aclosing(self._exchange(cmd, priority)) as response:
+            lines = [line async for line in response]
+        _LOGGER.debug("Response to %s: %s", cmd, lines)
+        return lines
+
+    # -----------------------
+    # Read sharing
+    # -----------------------
+
+    async def _read(self, cmd: str) -> list:
+        """Send a read command, sharing identical in-flight and recent reads.
+
+        Callers asking for a read that is already queued or on the wire
+        share its response; a successful response is then served from cache
+        for `cache_ttl` seconds, until a write invalidates it. A queued read
+        runs at the most urgent priority of its callers and is dropped from
+        the queue once all of them have given up.
+        """
+        loop = asyncio.get_running_loop()
+        cached = self._cache.get(cmd)
+        if cached and cached[0] > loop.time():
+            if self.stats:
+                self.stats.cache_hits += 1
+            return cached[1]
+
+        task = self._inflight.get(cmd)
+        if task is None:
+            task = self._inflight[cmd] = loop.create_task(self._fetch(cmd))
+            self._readers[task] = 0
+            task.add_done_callback(self._readers.pop)
+        else:
+            self._queue.promote(task, read_priority.get())
+            if self.stats:
+                self.stats.shared_reads += 1
+
+        self._readers[task] += 1
+        try:
+            # One caller giving up must not cancel the read for the others
+            lines = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                self._readers[task] -= 1
+                if not self._readers[task] and self._queue.is_queued(task):
+                    # Nobody wants it any more and it has not been sent yet
+                    task.cancel()
+            raise
+        if lines is None:
+            # Joined a streamed read that was abandoned part-way
+            return await self._read(cmd)
+        return lines
+
+    async def _fetch(self, cmd: str) -> list:
+        task = asyncio.current_task()
+        try:
+            lines = await self._send_command_multiple(cmd)
+        finally:
+            if self._inflight.get(cmd) is task:
+                del self._inflight[cmd]
+                invalidated = False
+            else:
+                # A write or status change arrived while this read was out
+                invalidated = True
+        if lines and self._cache_ttl and not invalidated:
+            self._cache[cmd] = (asyncio.get_running_loop().time() + self._cache_ttl, lines)
+        return lines
+
+    async def _stream(self, cmd: str):
+        """Like `_read`, but yield the response lines as they arrive.
+
+        A fresh cached response, or the same read already in flight, is
+        shared instead of sending the command again, and the stream is in
+        flight itself: `_read` callers asking for the same command meanwhile
+        get its full response. Consume under `aclosing()`.
+        """
+        loop = asyncio.get_running_loop()
+        cached = self._cache.get(cmd)
+        if cmd in self._inflight or cached and cached[0] > loop.time():
+            for line in await self._read(cmd):
+                yield line
+            return
+
+        shared = self._inflight[cmd] = loop.create_future()
+        # The stream reads for itself; callers that join are counted on top,
+        # so their giving up never cancels it
+        self._readers[shared] = 1
+        shared.add_done_callback(self._readers.pop)
+        generation = self._generation
+        lines = []
+        try:
+            async with aclosing(self._exchange(cmd, tag=shared)) as response:
+                async for line in response:
+                    lines.append(line)
+                    yield line
+            shared.set_result(lines)
+        except Exception as e:
+            shared.set_exception(e)
+            # Retrieved here, whether or not anyone joined
+            shared.exception()
+            raise
+        finally:
+            if self._inflight.get(cmd) is shared:
+                del self._inflight[cmd]
+            if not shared.done():
+                # Closed part-way: callers that joined send the read again
+                shared.set_result(None)
+        if lines and self._cache_ttl and generation == self._generation:
+            self._cache[cmd] = (loop.time() + self._cache_ttl, lines)
+
+    def _invalidate(self, prefix: str = ""):
+        """Forget cached and in-flight reads whose command starts with `prefix`."""
+        self._generation += 1
+        for store in (self._cache, self._inflight):
+            for cmd in [cmd for cmd in store if cmd.startswith(prefix)]:
+                del store[cmd]
+
+    # -----------------------
+    # Batched writes
+    # -----------------------
+
+    async def _queue_command(self, key, cmd: str) -> str:
+        """Queue a write for the next batch and wait for its response.
+
+        Commands queued within the batch window are sent in one write. A
+        command with the same `key` as one already queued replaces it: if it
+        is the same command its callers share the response, otherwise the
+        replaced command is never sent and its callers receive None.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        replaced, waiters = self._pending.pop(key, (None, []))
+        if replaced != cmd:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+            waiters = []
+        waiters.append(future)
+        self._pending[key] = (cmd, waiters)
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._batch_window, self._start_flush)
+        return await future
+
+    def _start_flush(self):
+        """Hand the queued commands to a flush task."""
+        self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        task = asyncio.get_running_loop().create_task(self._flush(list(batch.values())))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch):
+        """Send a batch of queued commands and resolve their waiters."""
+        started = asyncio.get_running_loop().time()
+        async with self._queue.slot(PRIORITY_WRITE):
+            self._slot_acquired(PRIORITY_WRITE, started)
+            try:
+                await self._ensure_connected()
+            except Exception as e:
+                self._fail(batch, e)
+                return
+
+            try:
+                self._discard_stale()
+                self._busy = True
+                remaining = list(batch)
+                while remaining:
+                    # Commands with known framing are pipelined; the rest need
+                    # the idle timeout to delimit their reply, so they go one at
+                    # a time, and may teach the framing of those after them.
+                    pipelined = [item for item in remaining if self._expected_lines(item[0]) is not None]
+                    if pipelined:
+                        remaining = [item for item in remaining if item not in pipelined]
+                        self._awaiting = {
+                            int(m[2]): cmd for cmd, _ in pipelined
+                            if cmd.startswith("s in ") and (m := _PORT_COMMAND.match(cmd))
+                        }
+                        await self._write([cmd for cmd, _ in pipelined])
+                        # One budget for the batch, not one per command
+                        deadline = asyncio.get_running_loop().time() + RESPONSE_TIMEOUT
+                        for cmd, waiters in pipelined:
+                            self._resolve(waiters, await self._read_response(cmd, deadline))
+                        continue
+                    cmd, waiters = remaining.pop(0)
+                    await self._write([cmd])
+                    self._resolve(waiters, await self._read_response(cmd))
+
+            except Exception as e:
+                _LOGGER.warning("Telnet batch failed (%s), reconnecting...", e)
+                self._fail(batch, e)
+                await self._connection_lost(e)
+            finally:
+                self._awaiting = {}
+                self._held = {}
+                self._release()
+
+    @staticmethod
+    def _fail(batch, err):
+        for _, waiters in batch:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(err)
+
+    @staticmethod
+    def _resolve(waiters, lines):
+        response = lines[-1] if lines else ""
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(response)
+
+    async def _send_command(self, cmd: str, priority: int = None):
+        cleaned = await self._send_command_multiple(cmd, priority)
+        return cleaned[-1] if cleaned else ""
 
     # -----------------------
     # Matrix control commands
@@ -115,118 +880,162 @@ class OreiMatrixClient:
 
     async def get_type(self) -> str:
         """Return matrix model type."""
-        return await self._send_command("r type!")
+        records = await self._read("r type!")
+        return records[-1].name if records else ""
 
     async def get_power(self) -> bool:
         """Return True if matrix power is ON."""
-        res = await self._send_command("r power!")
-        return "on" in res.lower()
+        records = await self._read("r power!")
+        return records[-1].on if records else False
 
     async def set_power(self, state: bool):
         """Turn matrix power ON or OFF."""
         cmd = f"s power {1 if state else 0}!"
-        await self._send_command(cmd)
+        # Power affects every other reading
+        self._invalidate()
+        try:
+            await self._send_command(cmd, PRIORITY_WRITE)
+        finally:
+            self._invalidate()
 
     async def get_output_source(self, output_id: int):
         """Get the current input assigned to a given output."""
-        res = await self._send_command(f"r av out {output_id}!")
-        _LOGGER.debug("Parsing output source response: %s", res)
-
-        res = res.lower().replace("->", " -> ").replace(":", " ")
-        parts = res.split()
-        input_id = None
-
-        try:
-            for i, token in enumerate(parts):
-                if token in ("input", "in") and i + 1 < len(parts):
-                    input_id = int(parts[i + 1])
-        except ValueError:
-            _LOGGER.warning("Could not parse integers from response: %s", res)
-            return None
-
-        return input_id
+        records = await self._read(f"r av out {output_id}!")
+        return next((r.input for r in records if r.output == output_id), None)
 
     async def get_output_sources(self):
-        """Get the current input assigned to a given output."""
-        results = await self._send_command_multiple(f"r av out 0!")
-        response = {}
+        """Get the current input assigned to every output."""
+        records = await self._read("r av out 0!")
+        return {r.output: r.input for r in records}
 
-        for res in results:
-            res = res.lower().replace("->", " -> ").replace(":", " ")
-            parts = res.split()
-            output_id = None
-            input_id = None
+    async def iter_output_sources(self):
+        """Yield the Route of every output as the matrix reports it."""
+        async with aclosing(self._stream("r av out 0!")) as records:
+            async for record in records:
+                yield record
 
-            try:
-                for i, token in enumerate(parts):
-                    if token in ("output", "out") and i + 1 < len(parts):
-                        output_id = int(parts[i + 1])
-                    if token in ("input", "in") and i + 1 < len(parts):
-                        input_id = int(parts[i + 1])
-                response[output_id] = input_id
-            except ValueError:
-                _LOGGER.warning("Could not parse integers from response: %s", res)
-                return None
-        return response
+    async def _get_links(self, direction: str, port: int):
+        records = await self._read(f"r link {direction} {port}!")
+        return {r.port: r.connected for r in records if r.direction == direction}
 
     async def get_in_link(self, input_id: int):
         """Get the input state."""
-        res = await self._send_command(f"r link in {input_id}!")
-        return not "disconnect" in res.lower()
+        return (await self._get_links("in", input_id)).get(input_id)
 
     async def get_in_links(self):
-        """Get the input state."""
-        results = await self._send_command_multiple(f"r link in 0!")
-        response = {}
-
-        for res in results:
-            res = res.lower().replace(":", " ")
-            parts = res.split()
-            input_id = None
-
-            try:
-                for i, token in enumerate(parts):
-                    if token in ("input", "in") and i + 1 < len(parts):
-                        input_id = int(parts[i + 1])
-                response[input_id] = not "disconnect" in res
-            except ValueError:
-                _LOGGER.warning("Could not parse integers from response: %s", res)
-                return None
-        return response
+        """Get the state of every input."""
+        return await self._get_links("in", 0)
 
     async def get_out_link(self, output_id: int):
         """Get the output state."""
-        res = await self._send_command(f"r link out {output_id}!")
-        return not "disconnect" in res.lower()
+        return (await self._get_links("out", output_id)).get(output_id)
 
     async def get_out_links(self):
-        """Get the input state."""
-        results = await self._send_command_multiple(f"r link out 0!")
-        response = {}
-
-        for res in results:
-            res = res.lower().replace(":", " ")
-            parts = res.split()
-            output_id = None
-
-            try:
-                for i, token in enumerate(parts):
-                    if token in ("output", "out") and i + 1 < len(parts):
-                        output_id = int(parts[i + 1])
-                response[output_id] = not "disconnect" in res
-            except ValueError:
-                _LOGGER.warning("Could not parse integers from response: %s", res)
-                return None
-        return response
+        """Get the state of every output."""
+        return await self._get_links("out", 0)
 
     async def set_cec_in(self, input_id: int, command: str):
-        """Send a CEC command to the input."""
-        await self._send_command(f"s cec in {input_id} {command}!")
+        """Send a CEC command to the input and return the matrix's ack."""
+        cmd = f"s cec in {input_id} {command}!"
+        return await self._queue_command(("cec", cmd), cmd)
 
     async def set_cec_out(self, output_id: int, command: str):
-        """Send a CEC command to the output."""
-        await self._send_command(f"s cec hdmi out {output_id} {command}!")
+        """Send a CEC command to the output and return the matrix's ack."""
+        cmd = f"s cec hdmi out {output_id} {command}!"
+        return await self._queue_command(("cec", cmd), cmd)
+
+    async def send_cec(self, command: str, inputs=(), outputs=()) -> dict:
+        """Send one CEC command to several inputs and outputs in one batch.
+
+        Duplicate ports are sent once. Returns {("in" | "out", port): ack
+        line or exception} so one failed target does not hide the others.
+        """
+        targets = [("in", port) for port in sorted(set(inputs))]
+        targets += [("out", port) for port in sorted(set(outputs))]
+        results = await asyncio.gather(
+            *(
+                self.set_cec_in(port, command) if direction == "in" else self.set_cec_out(port, command)
+                for direction, port in targets
+            ),
+            return_exceptions=True,
+        )
+        return dict(zip(targets, results))
+
+    async def set_output_source(self, input_id: int, output_id: int) -> bool:
+        """Assign an input to an output; False if the matrix did not take it."""
+        return (await self.set_output_sources({output_id: input_id}))[output_id]
 
-    async def set_output_source(self, input_id: int, output_id: int):
-        """Assign an input to an output."""
-        await self._send_command(f"s in {input_id} av out {output_id}!")
\ No newline at end of file
+    def requested_source(self, output_id: int):
+        """Input of the route most recently requested for an output, or None."""
+        return self._queued_routes.get(output_id)
+
+    async def _route(self, input_id: int, output_id: int):
+        """Send one route and return whether the matrix acknowledged it.
+
+        Returns None if a later route for the output replaced it before it
+        was sent.
+        """
+        self._invalidate("r av out")
+        self._queued_routes[output_id] = input_id
+        try:
+            ack = await self._queue_command(
+                ("route", output_id), f"s in {input_id} av out {output_id}!"
+            )
+        finally:
+            self._invalidate("r av out")
+        if ack is None:
+            return None
+        return ack == Route(output_id, input_id)
+
+    async def set_output_sources(self, routes: dict[int, int]) -> dict[int, bool]:
+        """Assign inputs to several outputs in one batch ({output: input}).
+
+        Every route's acknowledgement is checked. Routes that were not
+        acknowledged are looked up in one bulk read, and only those that
+        did not take effect are sent again, at most ROUTE_RETRIES times;
+        a re-sent route is judged by its acknowledgement alone, so a batch
+        costs at most one bulk read.
+        A route superseded by a later one for the same output is never sent
+        again and counts as a success: the last route for an output wins.
+        Returns {output: success}.
+        """
+        if not routes:
+            return {}
+        results = {}
+        pending = dict(routes)
+        for attempt in range(ROUTE_RETRIES + 1):
+            acks = await asyncio.gather(
+                *(self._route(input_id, output_id) for output_id, input_id in pending.items()),
+                return_exceptions=True,
+            )
+            if attempt == 0 and all(isinstance(ack, Exception) for ack in acks):
+                # Nothing reached the matrix
+                raise acks[0]
+            # None: replaced by a later route before it was sent
+            done = [out for out, ack in zip(pending, acks) if ack is True or ack is None]
+            results.update(dict.fromkeys(done, True))
+            pending = {out: inp for out, inp in pending.items() if out not in done}
+            if not pending:
+                break
+            actual = {}
+            if attempt == 0:
+                try:
+                    actual = await self.get_output_sources()
+                except Exception as e:
+                    _LOGGER.debug("Could not confirm routes %s: %s", pending, e)
+                    break
+            # Taken, or a later route for the output has been queued since
+            done = [
+                out for out, inp in pending.items()
+                if actual.get(out) == inp or self.requested_source(out) != inp
+            ]
+            results.update(dict.fromkeys(done, True))
+            pending = {out: inp for out, inp in pending.items() if out not in done}
+            if not pending:
+                break
+            if attempt < ROUTE_RETRIES:
+                _LOGGER.debug("Routes not taken, retrying: %s", pending)
+        if pending:
+            _LOGGER.warning("Orei Matrix did not take routes %s", pending)
+        results.update(dict.fromkeys(pending, False))
+        return results
@@ -0,0 +1,30 @@
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_HOST
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    """Return cached matrix state and connection statistics."""
+    data = hass.data[DOMAIN].entries[entry.entry_id]
+    client = data["client"]
+    coordinator = data["coordinator"]
+    return {
+        "config": async_redact_data(dict(entry.data), TO_REDACT),
+        "connection_state": client.state,
+        "queue_depth": client.queue_depth,
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": coordinator.update_interval.total_seconds(),
+        "data": {
+            "type": coordinator.data.get("type"),
+            "power": coordinator.data.get("power"),
+            "routing_version": coordinator.routing.version,
+            "outputs": coordinator.routing.routes,
+            "in_links": coordinator.routing.links("in"),
+            "out_links": coordinator.routing.links("out"),
+        },
+        "stats": client.stats.as_dict() if client.stats else "disabled",
+    }
@@ -0,0 +1,48 @@
+"""Work out which entities a change of cached matrix state affects.
+
+Entities register with the coordinator under a listener context: an output
+id for per-output entities, a `link_context()` for link sensors, or
+`MATRIX` for entities that only depend on matrix-wide state.
+"""
+
+# Listener context of entities that only depend on matrix-wide state (power,
+# model, availability) rather than on one port.
+MATRIX = "matrix"
+
+
+def link_context(direction: str, port: int):
+    """Listener context of the link sensor of one input ("in") or output ("out")."""
+    return (direction, port)
+
+
+def changed_contexts(old: dict, new: dict):
+    """Return the listener contexts whose state differs between two snapshots.
+
+    Returns None when matrix-wide state (power or model) changed, since that
+    affects every entity. An output is affected by its route, its own link
+    and the link of the input it currently shows.
+    """
+    if old is new:
+        return set()
+    if old.get("power") != new.get("power") or old.get("type") != new.get("type"):
+        return None
+
+    before, after = old.get("routing"), new.get("routing")
+    if before is None or after is None:
+        return set() if before is after else None
+
+    changed = after.changed_since(before)
+    for context in [c for c in changed if isinstance(c, tuple)]:
+        direction, port = context
+        if direction == "out":
+            changed.add(port)
+        else:
+            changed |= after.outputs_showing(port)
+    return changed
+
+
+def should_notify(context, changed) -> bool:
+    """Whether a listener registered with `context` must run for `changed`."""
+    if changed is None or context is None:
+        return True
+    return context in changed
@@ -0,0 +1,120 @@
+"""Find Orei matrices on the local network.
+
+Hosts are probed concurrently on the Telnet port: a short TCP connect
+weeds out everything that is not listening, and whatever is gets asked
+`r type!` and for its routes and links. Only a device that answers with
+parseable routes counts as a matrix, since many things listen on port 23.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import re
+from typing import NamedTuple
+
+from .coordinator import OreiMatrixClient
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PORT = 23
+# Hosts probed at once
+SCAN_CONCURRENCY = 64
+# Give up on a host that does not accept a connection within this long
+SCAN_CONNECT_TIMEOUT = 0.5
+# Upper bound for fingerprinting a host that did accept one
+PROBE_TIMEOUT = 4.0
+# Larger networks are narrowed to the /24 around the local address
+MAX_SCAN_PREFIX = 22
+
+# Port counts as encoded in the model name, e.g. UHD44-EXB400R-K is a 4x4
+_MODEL_SIZE = re.compile(r"^[A-Za-z]+-?(\d)(\d)(?!\d)")
+
+
+class DiscoveredMatrix(NamedTuple):
+    """A matrix that answered a probe."""
+    host: str
+    port: int
+    model: str
+    inputs: int
+    outputs: int
+
+
+def _port_counts(model: str, routes: dict, in_links: dict, out_links: dict):
+    """Work out (inputs, outputs) from the bulk replies, else from the model."""
+    size = _MODEL_SIZE.match(model)
+    inputs = max(in_links, default=0) or (int(size[1]) if size else max(routes.values(), default=0))
+    outputs = max(routes, default=0) or max(out_links, default=0) or (int(size[2]) if size else 0)
+    return inputs, outputs
+
+
+async def _fingerprint(client: OreiMatrixClient, host: str, port: int):
+    model = await client.get_type()
+    routes = await client.get_output_sources()
+    if not model or not routes:
+        return None
+    in_links = await client.get_in_links()
+    out_links = await client.get_out_links()
+    inputs, outputs = _port_counts(model, routes, in_links, out_links)
+    return DiscoveredMatrix(host, port, model, inputs, outputs)
+
+
+async def probe(host: str, port: int = DEFAULT_PORT, connect_timeout: float = SCAN_CONNECT_TIMEOUT):
+    """Return a DiscoveredMatrix if an Orei matrix answers at host:port, else None."""
+    client = OreiMatrixClient(host, port, batch_window=0, cache_ttl=0, connect_timeout=connect_timeout)
+    try:
+        await client.connect()
+    except (OSError, asyncio.TimeoutError):
+        return None
+    try:
+        return await asyncio.wait_for(_fingerprint(client, host, port), timeout=PROBE_TIMEOUT)
+    except (OSError, asyncio.TimeoutError, UnicodeDecodeError) as e:
+        _LOGGER.debug("No Orei Matrix at %s:%s: %r", host, port, e)
+        return None
+    finally:
+        await client.disconnect()
+
+
+def _is_ipv4(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).version == 4
+    except ValueError:
+        # A host name; it can only be skipped by address once resolved
+        return False
+
+
+def scan_hosts(networks, skip=()):
+    """Addresses to probe in the given IPv4 networks, each at most once.
+
+    Networks are given as interface addresses ("192.168.1.20/24"); ones
+    larger than /MAX_SCAN_PREFIX are narrowed to the /24 holding that
+    address, so one large LAN does not mean thousands of probes. Addresses
+    in `skip` (matrices already set up) are left out.
+    """
+    seen = {ipaddress.ip_address(host) for host in skip if _is_ipv4(host)}
+    for network in networks:
+        interface = ipaddress.ip_interface(network)
+        if interface.version != 4:
+            continue
+        net = interface.network
+        if net.prefixlen < MAX_SCAN_PREFIX:
+            net = ipaddress.ip_interface(f"{interface.ip}/24").network
+        for address in net.hosts():
+            if address not in seen:
+                seen.add(address)
+                yield str(address)
+
+
+async def scan(networks, port: int = DEFAULT_PORT, concurrency: int = SCAN_CONCURRENCY, skip=()):
+    """Probe every host of the given networks and return the matrices found.
+
+    Hosts in `skip` are never connected to, so a matrix already in use
+    does not get a second Telnet session.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(host):
+        async with semaphore:
+            return await probe(host, port)
+
+    results = await asyncio.gather(*(bounded(host) for host in scan_hosts(networks, skip)))
+    return [found for found in results if found is not None]
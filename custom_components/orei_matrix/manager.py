@@ -0,0 +1,111 @@
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID, ATTR_DEVICE_ID, ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+import asyncio
+import logging
+
+from .const import MAX_PARALLEL_MATRICES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OreiMatrixManager:
+    """Owns the client and coordinator of every configured matrix.
+
+    Keeps the poll schedules of the matrices out of phase, so they do not
+    all poll in the same instant, and runs operations that span several
+    matrices concurrently, talking to at most `max_parallel` at a time.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_parallel: int = MAX_PARALLEL_MATRICES):
+        self.hass = hass
+        # entry_id -> {"entry", "client", "coordinator", "store", "config"}
+        self.entries = {}
+        self._semaphore = asyncio.Semaphore(max_parallel)
+
+    def add(self, entry_id: str, data: dict):
+        self.entries[entry_id] = data
+        self._stagger()
+
+    async def async_remove(self, entry_id: str):
+        """Stop and forget one matrix."""
+        data = self.entries.pop(entry_id)
+        await data["coordinator"].async_shutdown()
+        await data["client"].disconnect()
+        self._stagger()
+        return data
+
+    def _stagger(self):
+        """Spread the poll phases of all matrices evenly over each interval."""
+        for index, data in enumerate(self.entries.values()):
+            data["coordinator"].poll_phase = index / len(self.entries)
+
+    # -----------------------
+    # Service targets
+    # -----------------------
+
+    def targets(self, call: ServiceCall) -> dict:
+        """Matrices a service call applies to.
+
+        Calls can name config entries, devices or entities; without any of
+        them they apply to every matrix.
+        """
+        if not any(call.data.get(key) for key in (ATTR_CONFIG_ENTRY_ID, ATTR_DEVICE_ID, ATTR_ENTITY_ID)):
+            return dict(self.entries)
+
+        entry_ids = set()
+        if entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID):
+            if entry_id not in self.entries:
+                raise HomeAssistantError(f"Unknown Orei Matrix config entry: {entry_id}")
+            entry_ids.add(entry_id)
+
+        devices = dr.async_get(self.hass)
+        for device_id in call.data.get(ATTR_DEVICE_ID, []):
+            device = devices.async_get(device_id)
+            matches = device.config_entries & self.entries.keys() if device else set()
+            if not matches:
+                raise HomeAssistantError(f"Not an Orei Matrix device: {device_id}")
+            entry_ids |= matches
+
+        entities = er.async_get(self.hass)
+        for entity_id in call.data.get(ATTR_ENTITY_ID, []):
+            entity = entities.async_get(entity_id)
+            if entity is None or entity.config_entry_id not in self.entries:
+                raise HomeAssistantError(f"Not an Orei Matrix entity: {entity_id}")
+            entry_ids.add(entity.config_entry_id)
+
+        return {entry_id: self.entries[entry_id] for entry_id in entry_ids}
+
+    # -----------------------
+    # Cross-device operations
+    # -----------------------
+
+    async def async_run(self, targets: dict, func) -> dict:
+        """Run `func(data)` for every target concurrently, within the limit.
+
+        Returns {entry_id: result}; a failing matrix maps to its exception
+        instead of stopping the others.
+        """
+        async def run(data):
+            async with self._semaphore:
+                return await func(data)
+
+        results = await asyncio.gather(*(run(data) for data in targets.values()), return_exceptions=True)
+        for entry_id, result in zip(targets, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Orei Matrix %s: %s", targets[entry_id]["entry"].title, result)
+        return dict(zip(targets, results))
+
+    @staticmethod
+    def raise_for_errors(results: dict, targets: dict):
+        """Raise one error naming every matrix that failed."""
+        failed = {
+            targets[entry_id]["entry"].title: err
+            for entry_id, err in results.items()
+            if isinstance(err, Exception)
+        }
+        if failed:
+            raise HomeAssistantError(
+                "; ".join(f"{title}: {err}" for title, err in failed.items())
+            )
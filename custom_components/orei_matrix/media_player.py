@@ -1,5 +1,4 @@
 from homeassistant.components.media_player import MediaPlayerEntity
-from homeassistant.core import callback
 from homeassistant.components.media_player.const import MediaPlayerEntityFeature
 from homeassistant.const import STATE_ON, STATE_OFF
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -10,7 +9,7 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Orei HDMI Matrix outputs as media players."""
-    data = hass.data[DOMAIN][entry.entry_id]
+    data = hass.data[DOMAIN].entries[entry.entry_id]
     client = data["client"]
     coordinator = data["coordinator"]
     config = data["config"]
@@ -31,7 +30,7 @@ class OreiMatrixOutputMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
                                 | MediaPlayerEntityFeature.TURN_ON
 
     def __init__(self, client, coordinator, config, name, output_id, entry_id):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=output_id)
         sources = config.get("sources", [])
         self._client = client
         self._config = config
@@ -39,37 +38,42 @@ class OreiMatrixOutputMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
         self._output_id = output_id
         self._sources = sources
         self._attr_source_list = sources
-        self._attr_source = None
         self._entry_id = entry_id
         self._attr_unique_id = f"{DOMAIN}_{config.get('host')}_{output_id}"
 
     @property
     def available(self):
-        """Entity availability based on matrix power."""
-        return bool(self.coordinator.data.get("power"))
+        """Entity availability based on connection and matrix power."""
+        return super().available and bool(self.coordinator.data.get("power"))
 
     @property
     def state(self):
         """Entity state is 'on' when matrix powered."""
         return STATE_ON if self.available else STATE_OFF
 
+    @property
+    def source(self):
+        """Name of the input this output currently shows."""
+        src_id = self.coordinator.routing.source(self._output_id)
+        if src_id and 1 <= src_id <= len(self._sources):
+            return self._sources[src_id - 1]
+        return None
+
     async def async_turn_on(self):
         if not self.available:
             return
-        outputs = self.coordinator.data.get("outputs")
-        if not outputs:
+        src_id = self.coordinator.routing.source(self._output_id)
+        if src_id is None:
             return
-        src_id = outputs[self._output_id]
         await self._client.set_cec_in(src_id, "on")
         self.async_write_ha_state()
 
     async def async_turn_off(self):
         if not self.available:
             return
-        outputs = self.coordinator.data.get("outputs")
-        if not outputs:
+        src_id = self.coordinator.routing.source(self._output_id)
+        if src_id is None:
             return
-        src_id = outputs[self._output_id]
         await self._client.set_cec_in(src_id, "off")
         self.async_write_ha_state()
 
@@ -85,18 +89,6 @@ class OreiMatrixOutputMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
             "model": model,
             "configuration_url": f"http://{self._config.get('host')}",
         }
-        
-    @callback
-    def _handle_coordinator_update(self):
-        if not self.available:
-            return
-        outputs = self.coordinator.data.get("outputs")
-        if not outputs:
-            return
-        src_id = outputs[self._output_id]
-        if src_id and 1 <= src_id <= len(self._sources):
-            self._attr_source = self._sources[src_id - 1]
-            self.async_write_ha_state()
 
     async def async_select_source(self, source):
         """Change active source for this output."""
@@ -107,6 +99,5 @@ class OreiMatrixOutputMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
             _LOGGER.warning("Unknown source %s for %s", source, self.name)
             return
         input_id = self._sources.index(source) + 1
-        await self._client.set_output_source(input_id, self._output_id)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_output_source(input_id, self._output_id)
         _LOGGER.info("Switched %s to %s", self.name, source)
\ No newline at end of file
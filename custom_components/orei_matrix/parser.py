@@ -0,0 +1,168 @@
+"""Table-driven parser for Orei HDMI Matrix Telnet responses."""
+
+import re
+from typing import NamedTuple
+
+
+class Route(NamedTuple):
+    """Input currently shown on an output."""
+    output: int
+    input: int
+
+
+class Link(NamedTuple):
+    """Hot-plug state of an input ("in") or output ("out") port."""
+    direction: str
+    port: int
+    connected: bool
+
+
+class Power(NamedTuple):
+    """Matrix power state."""
+    on: bool
+
+
+class Model(NamedTuple):
+    """Matrix model string, as returned by `r type!`."""
+    name: str
+
+
+# Deletes high-bit bytes (Telnet negotiation and other noise) and control
+# characters other than line breaks and tabs.
+_NOISE_BYTES = bytes([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), *range(0x80, 0x100)])
+
+# Banner and prompt lines printed around replies
+_BANNER = re.compile(r"^(?:\*{8}|FW Version|>$)|Welcome")
+
+_IN = r"(?:input|in)\s*:?\s*(\d+)"
+_OUT = r"(?:output|out)\s*:?\s*(\d+)"
+# Start of a reply line: skip a leading prompt, never match an echoed command
+_LINE = r"^[> \t]*(?![rs]\s)"
+
+
+def _route(m):
+    if m[1]:
+        return Route(int(m[2]), int(m[1]))
+    if m[3]:
+        return Route(int(m[4]), int(m[3]))
+    return Route(int(m[5]), int(m[6]))
+
+
+def _link(m):
+    return Link("in" if m[1][:2].lower() == "in" else "out", int(m[2]), m[3] is None)
+
+
+# Response type -> (pattern, record factory). Each pattern matches one reply
+# line; lines that do not match are skipped without affecting the rest.
+_PATTERNS = {
+    "route": (
+        re.compile(
+            _LINE + r"(?:"
+            # Common form first, so it is all most lines ever try
+            r"in(?:put)?\s*(\d+)\s*->\s*out(?:put)?\s*(\d+)"
+            rf"|[^\n]*?\b{_IN}\b[^\n]*?\b{_OUT}\b"
+            rf"|[^\n]*?\b{_OUT}\b[^\n]*?\b{_IN}\b)",
+            re.I | re.M,
+        ),
+        _route,
+    ),
+    "link": (
+        re.compile(_LINE + r"[^\n]*?\b(in|out)(?:put)?\s*:?\s*(\d+)\b[^\n]*?\b(dis)?connect", re.I | re.M),
+        _link,
+    ),
+    "power": (
+        re.compile(_LINE + r"[^\n]*?\bpower\b\s*:?\s*(on|off)\b", re.I | re.M),
+        lambda m: Power(m[1].lower() == "on"),
+    ),
+    "type": (
+        re.compile(r"^[> \t]*(?![rs]\s|\*{8}|FW Version|[^\n]*Welcome)([^\s>][^\n]*?)[ \t\r]*$", re.M),
+        lambda m: Model(m[1]),
+    ),
+}
+
+# Order used when the response type is not known (unsolicited lines). Model
+# strings cannot be told apart from other text, so "type" is never guessed.
+_STATUS_KINDS = ("link", "power", "route")
+
+# Response type each command answers with
+_COMMAND_KINDS = [
+    (re.compile(r"^[rs] power"), "power"),
+    (re.compile(r"^(r av out|s in \d+ av out)"), "route"),
+    (re.compile(r"^r link"), "link"),
+    (re.compile(r"^r type"), "type"),
+]
+
+
+class LineBuffer:
+    """Receive buffer that hands out cleaned lines as they arrive.
+
+    Noise bytes are dropped and the text decoded once per received chunk
+    rather than once per line, and lines are cut straight out of the
+    decoded text instead of being copied off a bytearray first.
+    """
+
+    __slots__ = ("_text", "_pos")
+
+    def __init__(self):
+        self._text = ""
+        # Start of the first line not taken yet
+        self._pos = 0
+
+    def __len__(self):
+        return len(self._text) - self._pos
+
+    def feed(self, data: bytes):
+        """Append raw bytes received from the matrix."""
+        chunk = data.translate(None, _NOISE_BYTES).decode("ascii")
+        self._text = self._text[self._pos:] + chunk if self._pos else self._text + chunk
+        self._pos = 0
+
+    def clear(self):
+        self._text = ""
+        self._pos = 0
+
+    def take(self, flush: bool = False):
+        """Pop the next complete line, or None.
+
+        A bare `>` prompt is returned even without a trailing newline. With
+        `flush`, a trailing partial line is returned as well.
+        """
+        text = self._text
+        end = text.find("\n", self._pos)
+        if end >= 0:
+            line = text[self._pos:end].strip()
+            self._pos = end + 1
+        else:
+            line = text[self._pos:].strip()
+            if not (flush or line == ">"):
+                return None
+            self.clear()
+        # A prompt in front of the next line only closes the previous reply
+        return line.lstrip("> ") or line
+
+
+def is_noise(line: str, cmd: str) -> bool:
+    """Return True for echoed command, banner and prompt lines."""
+    return line.startswith(cmd.split()[0]) or bool(_BANNER.search(line))
+
+
+def command_kind(cmd: str):
+    """Return the response type `cmd` answers with, or None."""
+    for pattern, kind in _COMMAND_KINDS:
+        if pattern.match(cmd):
+            return kind
+    return None
+
+
+def parse_line(line: str, kind: str = None):
+    """Parse one line into a record, or None if it does not match.
+
+    With `kind` only that response type is tried; without it the line is
+    treated as an unsolicited status line.
+    """
+    for k in (kind,) if kind else _STATUS_KINDS:
+        pattern, factory = _PATTERNS[k]
+        if m := pattern.match(line):
+            return factory(m)
+    return None
+
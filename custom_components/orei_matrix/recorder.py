@@ -0,0 +1,77 @@
+"""Record the raw Telnet traffic of a client for offline replay.
+
+A trace is a JSON Lines file: a header object, then one event per line,
+
+    [seconds since start, "c"]          connected
+    [seconds since start, "w", data]    bytes written to the matrix
+    [seconds since start, "r", data]    bytes received from the matrix
+
+with the bytes as Latin-1 text, so noise bytes survive unchanged.
+benchmarks/replay.py serves a trace back to a client.
+"""
+
+import json
+import time
+
+TRACE_FORMAT = "orei-matrix-trace"
+TRACE_VERSION = 1
+# Stop recording after this many events rather than grow without bound
+MAX_EVENTS = 100_000
+
+CONNECTED = "c"
+SENT = "w"
+RECEIVED = "r"
+
+
+class TrafficRecorder:
+    """Collects the traffic of one client in memory until saved."""
+
+    def __init__(self, host: str, port: int):
+        self.header = {
+            "format": TRACE_FORMAT,
+            "version": TRACE_VERSION,
+            "host": host,
+            "port": port,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        }
+        self.events = []
+        self._start = time.monotonic()
+
+    def _add(self, kind: str, data: bytes = None):
+        if len(self.events) >= MAX_EVENTS:
+            return
+        event = [round(time.monotonic() - self._start, 4), kind]
+        if data is not None:
+            event.append(data.decode("latin-1"))
+        self.events.append(event)
+
+    def connected(self):
+        self._add(CONNECTED)
+
+    def sent(self, data: bytes):
+        self._add(SENT, data)
+
+    def received(self, data: bytes):
+        self._add(RECEIVED, data)
+
+    def dumps(self) -> str:
+        return "".join(json.dumps(line, separators=(",", ":")) + "\n" for line in (self.header, *self.events))
+
+    def save(self, path):
+        """Write the trace to `path` (blocking)."""
+        with open(path, "w", encoding="ascii") as file:
+            file.write(self.dumps())
+
+
+def load(path):
+    """Read a trace file into (header, [(seconds, kind, bytes or None)])."""
+    with open(path, encoding="ascii") as file:
+        header = json.loads(file.readline())
+        if header.get("format") != TRACE_FORMAT or header.get("version") != TRACE_VERSION:
+            raise ValueError(f"{path} is not a version {TRACE_VERSION} Orei Matrix trace")
+        events = []
+        for line in file:
+            if line.strip():
+                at, kind, *data = json.loads(line)
+                events.append((at, kind, data[0].encode("latin-1") if data else None))
+    return header, events
@@ -0,0 +1,187 @@
+"""Versioned routing and link state of one matrix."""
+
+import itertools
+
+# Versions are unique across all states, so a state derived later always
+# has a higher version than the one it was derived from.
+_versions = itertools.count(1)
+
+# Number of ancestors a state remembers for cheap diffs
+_ANCESTRY = 8
+
+
+class RoutingState:
+    """Routes and hot-plug links, with O(1) lookups in both directions.
+
+    Routes are kept in an array indexed by output, with a reverse index of
+    input -> outputs showing it; links are bitmaps per direction. A state
+    is never modified once built: `updated()` returns a new state with a
+    higher version, or the same state when nothing changed. Every port
+    remembers the version it last changed in, so `changed_since()` a
+    recent ancestor only looks at version numbers.
+    """
+
+    __slots__ = (
+        "version",
+        "_ancestry",
+        "_routes",
+        "_route_versions",
+        "_by_input",
+        "_links",
+        "_known",
+        "_link_versions",
+    )
+
+    def __init__(self):
+        self.version = next(_versions)
+        # Versions of the states this one was derived from, newest first
+        self._ancestry = ()
+        # Index output - 1 -> input (or None when unknown)
+        self._routes = []
+        self._route_versions = []
+        self._by_input = {}
+        # Direction -> bitmap of connected ports / of ports reported at all
+        self._links = {"in": 0, "out": 0}
+        self._known = {"in": 0, "out": 0}
+        self._link_versions = {"in": {}, "out": {}}
+
+    @classmethod
+    def from_dicts(cls, routes=None, in_links=None, out_links=None):
+        """Build a state from {output: input} and {port: connected} maps."""
+        return cls().updated(routes=routes, in_links=in_links, out_links=out_links)
+
+    # -----------------------
+    # Lookups
+    # -----------------------
+
+    @property
+    def output_count(self) -> int:
+        return len(self._routes)
+
+    def source(self, output_id: int):
+        """Input shown on an output, or None if unknown."""
+        if 1 <= output_id <= len(self._routes):
+            return self._routes[output_id - 1]
+        return None
+
+    def outputs_showing(self, input_id: int) -> frozenset:
+        """Outputs currently showing an input."""
+        return self._by_input.get(input_id, frozenset())
+
+    @property
+    def routes(self) -> dict:
+        """{output: input} for every output with a known route."""
+        return {out: inp for out, inp in enumerate(self._routes, start=1) if inp is not None}
+
+    def link(self, direction: str, port: int):
+        """Whether a port is connected, or None if it was never reported."""
+        bit = 1 << port
+        if not self._known[direction] & bit:
+            return None
+        return bool(self._links[direction] & bit)
+
+    def links(self, direction: str) -> dict:
+        """{port: connected} for every reported port of one direction."""
+        known, links = self._known[direction], self._links[direction]
+        return {
+            port: bool(links >> port & 1)
+            for port in range(1, known.bit_length())
+            if known >> port & 1
+        }
+
+    # -----------------------
+    # Updates
+    # -----------------------
+
+    def updated(self, routes=None, in_links=None, out_links=None) -> "RoutingState":
+        """Return a state with the given routes and links merged in."""
+        state = None
+
+        def copy():
+            new = RoutingState.__new__(RoutingState)
+            new.version = next(_versions)
+            new._ancestry = (self.version, *self._ancestry[:_ANCESTRY - 1])
+            new._routes = list(self._routes)
+            new._route_versions = list(self._route_versions)
+            new._by_input = dict(self._by_input)
+            new._links = dict(self._links)
+            new._known = dict(self._known)
+            new._link_versions = {d: dict(v) for d, v in self._link_versions.items()}
+            return new
+
+        for output_id, input_id in (routes or {}).items():
+            if output_id is None or output_id < 1 or self.source(output_id) == input_id:
+                continue
+            state = state or copy()
+            if output_id > len(state._routes):
+                grow = output_id - len(state._routes)
+                state._routes.extend([None] * grow)
+                state._route_versions.extend([0] * grow)
+            previous = state._routes[output_id - 1]
+            if previous is not None:
+                state._by_input[previous] = state._by_input[previous] - {output_id}
+                if not state._by_input[previous]:
+                    del state._by_input[previous]
+            if input_id is not None:
+                state._by_input[input_id] = state._by_input.get(input_id, frozenset()) | {output_id}
+            state._routes[output_id - 1] = input_id
+            state._route_versions[output_id - 1] = state.version
+
+        for direction, links in (("in", in_links), ("out", out_links)):
+            for port, connected in (links or {}).items():
+                if port is None or port < 1 or self.link(direction, port) == connected:
+                    continue
+                state = state or copy()
+                bit = 1 << port
+                state._known[direction] |= bit
+                if connected:
+                    state._links[direction] |= bit
+                else:
+                    state._links[direction] &= ~bit
+                state._link_versions[direction][port] = state.version
+
+        return state or self
+
+    def changed_since(self, other: "RoutingState") -> set:
+        """Listener contexts that differ from `other`.
+
+        Outputs appear as their id, links as ("in", port) / ("out", port).
+        """
+        if other is self:
+            return set()
+        if other.version in self._ancestry:
+            since = other.version
+            changed = {
+                out for out, v in enumerate(self._route_versions, start=1) if v > since
+            }
+            for direction, versions in self._link_versions.items():
+                changed.update((direction, port) for port, v in versions.items() if v > since)
+            return changed
+
+        # Unrelated states (e.g. restored vs. polled): compare everything
+        changed = set()
+        for out in range(1, max(self.output_count, other.output_count) + 1):
+            if self.source(out) != other.source(out):
+                changed.add(out)
+        for direction in ("in", "out"):
+            if self._links[direction] != other._links[direction] or self._known[direction] != other._known[direction]:
+                mine, theirs = self.links(direction), other.links(direction)
+                changed.update(
+                    (direction, port) for port in mine.keys() | theirs.keys()
+                    if mine.get(port) != theirs.get(port)
+                )
+        return changed
+
+    def __eq__(self, other):
+        if not isinstance(other, RoutingState):
+            return NotImplemented
+        return (
+            self._routes == other._routes
+            and self._links == other._links
+            and self._known == other._known
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"RoutingState(v{self.version}, routes={self.routes})"
@@ -0,0 +1,92 @@
+"""Priority scheduling of the single Telnet connection to the matrix."""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+from contextvars import ContextVar
+
+# Lower runs first
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+PRIORITY_POLL = 2
+PRIORITY_NAMES = {PRIORITY_WRITE: "write", PRIORITY_READ: "read", PRIORITY_POLL: "poll"}
+
+# Priority of reads issued from the current task
+read_priority = ContextVar("orei_matrix_read_priority", default=PRIORITY_READ)
+
+
+@contextlib.contextmanager
+def background():
+    """Run reads issued inside the block at background poll priority."""
+    token = read_priority.set(PRIORITY_POLL)
+    try:
+        yield
+    finally:
+        read_priority.reset(token)
+
+
+class CommandQueue:
+    """Grants exclusive use of the connection, most urgent waiter first.
+
+    Used instead of a FIFO lock so that a user's write waits for at most the
+    command already on the wire, not for the rest of a poll queued ahead of
+    it. Waiters of equal priority are served in arrival order.
+    """
+
+    def __init__(self):
+        self._busy = False
+        # Heap of [priority, sequence, future, tag]
+        self._waiting = []
+        self._sequence = itertools.count()
+
+    @property
+    def depth(self) -> int:
+        """Number of waiters, not counting the current holder."""
+        return len(self._waiting)
+
+    def is_queued(self, tag) -> bool:
+        return any(entry[3] is tag for entry in self._waiting)
+
+    def promote(self, tag, priority: int):
+        """Raise the priority of waiters carrying `tag` to at least `priority`."""
+        changed = False
+        for entry in self._waiting:
+            if entry[3] is tag and entry[0] > priority:
+                entry[0] = priority
+                changed = True
+        if changed:
+            heapq.heapify(self._waiting)
+
+    async def acquire(self, priority: int, tag=None):
+        if not self._busy and not self._waiting:
+            self._busy = True
+            return
+        entry = [priority, next(self._sequence), asyncio.get_running_loop().create_future(), tag]
+        heapq.heappush(self._waiting, entry)
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry in self._waiting:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+            elif not entry[2].cancelled():
+                # Granted just before the cancellation: hand it on
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiting:
+            future = heapq.heappop(self._waiting)[2]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._busy = False
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: int, tag=None):
+        await self.acquire(priority, tag)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,108 @@
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from datetime import timedelta
+from .const import DOMAIN
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Statistics change with every command, so sample them instead of pushing
+SCAN_INTERVAL = timedelta(seconds=30)
+
+# key -> (name, unit, state class, value from ClientStats)
+STATS_SENSORS = {
+    "response_avg": (
+        "Response time", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+        lambda stats: stats.phase("response").as_dict()["avg_ms"],
+    ),
+    "response_p95": (
+        "Response time p95", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+        lambda stats: stats.phase("response").percentile(95),
+    ),
+    "write_wait_p95": (
+        "Write queue wait p95", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+        lambda stats: stats.histogram("queue_wait", "write").percentile(95),
+    ),
+    "queue_wait_p95": (
+        "Queue wait p95", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+        lambda stats: stats.phase("queue_wait").percentile(95),
+    ),
+    "queue_depth": (
+        "Queue depth", None, SensorStateClass.MEASUREMENT,
+        lambda stats: stats.queue_depth,
+    ),
+    "last_poll": (
+        "Last poll duration", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+        lambda stats: stats.last_poll_ms,
+    ),
+    "commands": (
+        "Commands sent", None, SensorStateClass.TOTAL_INCREASING,
+        lambda stats: stats.commands,
+    ),
+    "timeouts": (
+        "Response timeouts", None, SensorStateClass.TOTAL_INCREASING,
+        lambda stats: stats.timeouts,
+    ),
+    "reconnects": (
+        "Reconnects", None, SensorStateClass.TOTAL_INCREASING,
+        lambda stats: stats.reconnects,
+    ),
+    "bytes_in": (
+        "Bytes received", UnitOfInformation.BYTES, SensorStateClass.TOTAL_INCREASING,
+        lambda stats: stats.bytes_in,
+    ),
+    "bytes_out": (
+        "Bytes sent", UnitOfInformation.BYTES, SensorStateClass.TOTAL_INCREASING,
+        lambda stats: stats.bytes_out,
+    ),
+}
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up connection statistics sensors when statistics are enabled."""
+    data = hass.data[DOMAIN].entries[entry.entry_id]
+    client = data["client"]
+    if client.stats is None:
+        return
+    coordinator = data["coordinator"]
+    config = data["config"]
+
+    async_add_entities([
+        OreiMatrixStatsSensor(client, coordinator, config, key, entry.entry_id)
+        for key in STATS_SENSORS
+    ])
+
+
+class OreiMatrixStatsSensor(SensorEntity):
+    """One connection statistic of the Telnet client."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, client, coordinator, config, key, entry_id):
+        name, unit, state_class, value = STATS_SENSORS[key]
+        self._client = client
+        self._coordinator = coordinator
+        self._config = config
+        self._entry_id = entry_id
+        self._value = value
+        self._attr_name = f"{config.get('host', 'Orei Matrix')} {name}"
+        self._attr_unique_id = f"{DOMAIN}_{config.get('host')}_stats_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+
+    @property
+    def device_info(self):
+        """Device info for grouping and model-based naming."""
+        model = self._coordinator.data.get("type", "Unknown")
+        name = f"Orei {model}" if model != "Unknown" else "Orei HDMI Matrix"
+        return {
+            "identifiers": {(DOMAIN, self._entry_id)},
+            "name": name,
+            "manufacturer": "Orei",
+            "model": model,
+            "configuration_url": f"http://{self._config.get('host')}",
+        }
+
+    @property
+    def native_value(self):
+        return self._value(self._client.stats)
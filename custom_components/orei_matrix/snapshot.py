@@ -0,0 +1,55 @@
+"""Last-known matrix state as persisted between restarts.
+
+Port numbers are stored as strings since JSON object keys must be strings.
+`inputs` and `outputs` are the highest port numbers seen, carried over
+from the previous snapshot while the live state does not show them.
+"""
+
+from .routing import RoutingState
+
+
+def dump(data: dict) -> dict:
+    """Turn coordinator data into a JSON-serialisable snapshot."""
+    routing = data.get("routing") or RoutingState()
+    routes, in_links, out_links = routing.routes, routing.links("in"), routing.links("out")
+    inputs = max([*in_links, *routes.values()], default=0)
+    outputs = max([*out_links, *routes], default=0)
+    state = {"outputs": routes, "in_links": in_links, "out_links": out_links}
+    state = {key: {str(port): v for port, v in value.items()} for key, value in state.items() if value}
+    if data.get("power") is not None:
+        state["power"] = data["power"]
+    return {
+        "type": data.get("type"),
+        "inputs": inputs or data.get("inputs"),
+        "outputs": outputs or data.get("outputs"),
+        "state": state,
+    }
+
+
+def _port_count(value):
+    return value if isinstance(value, int) and not isinstance(value, bool) and value > 0 else None
+
+
+def load(stored) -> dict | None:
+    """Turn a stored snapshot back into coordinator data, or None if unusable."""
+    if not isinstance(stored, dict) or not isinstance(stored.get("state"), dict):
+        return None
+    state = stored["state"]
+    if "power" not in state:
+        return None
+    try:
+        maps = {
+            key: {int(port): v for port, v in (state.get(key) or {}).items()}
+            for key in ("outputs", "in_links", "out_links")
+        }
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return {
+        "type": stored.get("type"),
+        "inputs": _port_count(stored.get("inputs")),
+        "outputs": _port_count(stored.get("outputs")),
+        "power": state["power"],
+        "routing": RoutingState.from_dicts(
+            routes=maps["outputs"], in_links=maps["in_links"], out_links=maps["out_links"]
+        ),
+    }
@@ -0,0 +1,124 @@
+"""Lightweight latency and traffic statistics for the Orei Matrix client."""
+
+import bisect
+import re
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_PORT_NUMBERS = re.compile(r"\d+")
+
+
+def command_type(cmd: str) -> str:
+    """Group commands by shape, e.g. 's in 2 av out 3!' -> 's in N av out N'."""
+    return _PORT_NUMBERS.sub("N", cmd.rstrip("!"))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds: float):
+        ms = seconds * 1000
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, pct: float):
+        """Upper bound of the bucket holding the given percentile, in ms."""
+        if not self.count:
+            return None
+        target = self.count * pct / 100
+        seen = 0
+        for bound, n in zip(BUCKETS_MS + (self.max,), self.buckets):
+            seen += n
+            if seen >= target:
+                return round(min(bound, self.max), 1)
+        return round(self.max, 1)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 1) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": round(self.max, 1),
+            "buckets_ms": dict(zip([*map(str, BUCKETS_MS), "inf"], self.buckets)),
+        }
+
+
+class ClientStats:
+    """Counters and per-command-type histograms.
+
+    Histograms are kept per (phase, command type), where phase is one of
+    "queue_wait" (keyed by priority class instead), "write", "response" or
+    "poll".
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.commands = 0
+        self.timeouts = 0
+        self.empty_responses = 0
+        self.reconnects = 0
+        self.connect_failures = 0
+        self.cache_hits = 0
+        self.shared_reads = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.last_poll_ms = None
+
+    def record(self, phase: str, cmd: str, seconds: float):
+        key = (phase, command_type(cmd))
+        if (histogram := self.histograms.get(key)) is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.add(seconds)
+        if phase == "poll":
+            self.last_poll_ms = round(seconds * 1000, 1)
+
+    def histogram(self, phase: str, cmd: str) -> Histogram:
+        """Histogram of one phase and command type (empty if never recorded)."""
+        return self.histograms.get((phase, command_type(cmd))) or Histogram()
+
+    def phase(self, phase: str) -> Histogram:
+        """All command types of one phase merged into a single histogram."""
+        merged = Histogram()
+        for (p, _), histogram in self.histograms.items():
+            if p != phase:
+                continue
+            merged.count += histogram.count
+            merged.total += histogram.total
+            merged.max = max(merged.max, histogram.max)
+            merged.buckets = [a + b for a, b in zip(merged.buckets, histogram.buckets)]
+        return merged
+
+    def as_dict(self):
+        phases = {}
+        for (phase, cmd), histogram in sorted(self.histograms.items()):
+            phases.setdefault(phase, {})[cmd] = histogram.as_dict()
+        return {
+            "commands": self.commands,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "timeouts": self.timeouts,
+            "empty_responses": self.empty_responses,
+            "reconnects": self.reconnects,
+            "connect_failures": self.connect_failures,
+            "cache_hits": self.cache_hits,
+            "shared_reads": self.shared_reads,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "last_poll_ms": self.last_poll_ms,
+            "histograms": phases,
+        }
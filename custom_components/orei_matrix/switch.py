@@ -1,12 +1,13 @@
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import DOMAIN
+from .diff import MATRIX
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
-    data = hass.data[DOMAIN][entry.entry_id]
+    data = hass.data[DOMAIN].entries[entry.entry_id]
     client = data["client"]
     coordinator = data["coordinator"]
     config = data["config"]
@@ -18,7 +19,7 @@ class OreiMatrixPowerSwitch(CoordinatorEntity, SwitchEntity):
     """Switch for Orei HDMI Matrix power."""
 
     def __init__(self, client, coordinator, config, entry_id):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=MATRIX)
         self._client = client
         self._config = config
         self._entry_id = entry_id
@@ -43,9 +44,7 @@ class OreiMatrixPowerSwitch(CoordinatorEntity, SwitchEntity):
         return self.coordinator.data.get("power")
 
     async def async_turn_on(self, **kwargs):
-        await self._client.set_power(True)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_power(True)
 
     async def async_turn_off(self, **kwargs):
-        await self._client.set_power(False)
-        await self.coordinator.async_request_refresh()
\ No newline at end of file
+        await self.coordinator.async_set_power(False)
\ No newline at end of file
@@ -0,0 +1,343 @@
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from contextlib import aclosing
+from datetime import timedelta
+import logging
+import time
+
+from .const import (
+    POLL_TIERS,
+    POLL_BURST_DURATION,
+    POLL_IDLE_AFTER,
+    PUSH_RECONCILE_INTERVAL,
+)
+from .coordinator import OreiMatrixClient, STATE_CONNECTED
+from .diff import changed_contexts, should_notify
+from .scheduler import background
+from .parser import Link, Power, Route
+from .routing import RoutingState
+
+_LOGGER = logging.getLogger(__name__)
+
+# Delay before the single poll that confirms optimistic writes
+CONFIRM_DELAY = 2
+
+
+class OreiMatrixCoordinator(DataUpdateCoordinator):
+    """Polls the matrix and serves as a write-through cache of its state.
+
+    State is polled in tiers (power, routing, input links, output links),
+    each on its own schedule. Tiers poll quickly for a while after a command
+    or a detected change and back off once the matrix has been quiet. While
+    the matrix is off only power is polled.
+
+    Entities subscribe with a listener context from `diff` (an output id, a
+    link or the whole matrix) and are only called back when that part of
+    the state changed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: OreiMatrixClient,
+        push: bool = False,
+        restored: dict = None,
+    ):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="orei_matrix",
+            # Recomputed after every refresh from the tier schedule
+            update_interval=timedelta(seconds=min(t[1] for t in POLL_TIERS.values())),
+            # Only notify entities when a refresh actually changed something,
+            # so confirming an optimistic write is silent unless it failed.
+            always_update=False,
+        )
+        self.client = client
+        self._push = push
+        # Model detection runs with the first live refresh
+        self._type_detected = False
+        # Every tier is due on the first refresh
+        self._next_poll = dict.fromkeys(POLL_TIERS, 0.0)
+        self._burst_until = 0.0
+        self._last_change = time.monotonic()
+        # Fraction of each tier interval this matrix polls at, set by the
+        # manager to keep several matrices out of step; None polls freely
+        self.poll_phase = None
+        # (last_update_success, data) as of the last listener fan-out
+        self._published = None
+        if restored:
+            # Last-known state from the previous run; refreshed in the background
+            self.data = restored
+        self._remove_state_listener = client.add_state_listener(self._async_connection_state)
+        self._confirm = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=CONFIRM_DELAY,
+            immediate=False,
+            function=self.async_refresh,
+        )
+
+    async def _async_update_data(self):
+        now = time.monotonic()
+        started = time.perf_counter()
+        data = dict(self.data or {})
+        due = {tier for tier, at in self._next_poll.items() if at <= now}
+
+        # Polls yield the connection to user commands queued behind them
+        with background():
+            try:
+                if not self._type_detected:
+                    data["type"] = await self.client.get_type() or data.get("type")
+                    self._type_detected = True
+                if "power" in due or "power" not in data:
+                    power = await self.client.get_power()
+                    if power and not data.get("power"):
+                        # Just switched on: everything skipped while off is stale
+                        due.update(POLL_TIERS)
+                    self._store(data, "power", power)
+                if data["power"]:
+                    if "outputs" in due:
+                        await self._async_poll_routes(data)
+                    if "in_links" in due:
+                        self._store_routing(data, in_links=await self.client.get_in_links())
+                    if "out_links" in due:
+                        self._store_routing(data, out_links=await self.client.get_out_links())
+            except Exception as err:
+                _LOGGER.error("Update failed: %s", err)
+                raise UpdateFailed(err)
+
+        if stats := self.client.stats:
+            stats.record("poll", "cycle", time.perf_counter() - started)
+        for tier in due:
+            interval = self._tier_interval(tier, data["power"])
+            self._next_poll[tier] = self._phased(now + interval, interval, now)
+        self._reschedule()
+        return data
+
+    @callback
+    def async_update_listeners(self):
+        """Call back only the listeners whose part of the state changed."""
+        published = (self.last_update_success, self.data or {})
+        previous, self._published = self._published, published
+        if previous is None or previous[0] != published[0]:
+            # First update or availability change: every entity is affected
+            changed = None
+        else:
+            changed = changed_contexts(previous[1], published[1])
+            if not changed and changed is not None:
+                return
+        for update_callback, context in list(self._listeners.values()):
+            if should_notify(context, changed):
+                update_callback()
+
+    # -----------------------
+    # Poll scheduling
+    # -----------------------
+
+    def _store(self, data, key, value):
+        """Store a polled value, noting whether it changed."""
+        if key in data and data[key] != value:
+            self._note_activity()
+        data[key] = value
+
+    def _store_routing(self, data, **changes):
+        """Merge polled routes or links into the routing state."""
+        routing = data.get("routing")
+        updated = (routing or RoutingState()).updated(**changes)
+        if routing is not None and updated is not routing:
+            self._note_activity()
+        data["routing"] = updated
+
+    async def _async_poll_routes(self, data):
+        """Poll the routes, publishing each changed one as soon as it arrives.
+
+        Entities of an output whose route changed update while the rest of
+        the bulk reply, and the link tiers after it, are still on the wire.
+        """
+        async with aclosing(self.client.iter_output_sources()) as routes:
+            async for route in routes:
+                before = data.get("routing")
+                self._store_routing(data, routes={route.output: route.input})
+                if self.data is not None and before is not None and data["routing"] is not before:
+                    self.async_set_updated_data(dict(data))
+
+    def _tier_interval(self, tier, power):
+        """Seconds until `tier` should be polled again."""
+        burst, normal, idle = POLL_TIERS[tier]
+        if self._push:
+            return PUSH_RECONCILE_INTERVAL
+        now = time.monotonic()
+        if not power:
+            # Only power is polled while off, and only at the idle rate
+            return idle
+        if now < self._burst_until:
+            return burst
+        if now - self._last_change > POLL_IDLE_AFTER:
+            return idle
+        return normal
+
+    def _phased(self, at, interval, now):
+        """Move a poll time to the nearest point of this matrix's phase."""
+        if self.poll_phase is None:
+            return at
+        offset = self.poll_phase * interval
+        aligned = offset + round((at - offset) / interval) * interval
+        return max(aligned, now + 1)
+
+    def _note_activity(self):
+        """Poll at the busy rate for a while after a command or change."""
+        now = time.monotonic()
+        self._last_change = now
+        if self._push:
+            return
+        self._burst_until = now + POLL_BURST_DURATION
+        for tier, (burst, _, _) in POLL_TIERS.items():
+            self._next_poll[tier] = min(self._next_poll[tier], now + burst)
+        self._reschedule()
+
+    def _reschedule(self):
+        """Point the coordinator timer at the next due tier."""
+        delay = min(self._next_poll.values()) - time.monotonic()
+        self.update_interval = timedelta(seconds=max(delay, 1))
+
+    async def async_refresh_all(self):
+        """Refresh every tier now, e.g. for the refresh service."""
+        self._next_poll = dict.fromkeys(POLL_TIERS, 0.0)
+        await self.async_request_refresh()
+
+    async def async_shutdown(self):
+        await super().async_shutdown()
+        self._confirm.async_shutdown()
+        # Shutdown runs again when HA unloads an entry removed explicitly
+        if self._remove_state_listener:
+            self._remove_state_listener()
+            self._remove_state_listener = None
+
+    @callback
+    def _async_connection_state(self, state):
+        """Mark entities unavailable as soon as the connection drops."""
+        if state == STATE_CONNECTED:
+            if not self.last_update_success:
+                self.hass.async_create_task(self.async_refresh_all())
+        else:
+            self.async_set_update_error(ConnectionError(f"Orei Matrix connection {state}"))
+
+    # -----------------------
+    # Cache updates
+    # -----------------------
+
+    @callback
+    def async_handle_status(self, record):
+        """Apply an unsolicited status record from the matrix."""
+        if isinstance(record, Power):
+            self._async_write_through(power=record.on)
+        elif isinstance(record, Route):
+            self._async_write_through(routes={record.output: record.input})
+        elif isinstance(record, Link):
+            key = "in_links" if record.direction == "in" else "out_links"
+            self._async_write_through(**{key: {record.port: record.connected}})
+
+    @callback
+    def _async_write_through(self, power=None, **routing):
+        """Merge changes into the cached data and update entities now.
+
+        `routing` takes the keyword arguments of `RoutingState.updated`.
+        """
+        data = dict(self.data or {})
+        if power is not None:
+            data["power"] = power
+        if routing:
+            data["routing"] = (data.get("routing") or RoutingState()).updated(**routing)
+        self._note_activity()
+        self.async_set_updated_data(data)
+
+    @property
+    def routing(self) -> RoutingState:
+        """Current routing and link state."""
+        return (self.data or {}).get("routing") or RoutingState()
+
+    # -----------------------
+    # Commands
+    # -----------------------
+
+    async def async_set_output_source(self, input_id: int, output_id: int):
+        """Route an input to an output, raising if the matrix did not take it."""
+        results = await self.async_set_output_sources({output_id: input_id})
+        if not results[output_id]:
+            raise HomeAssistantError(
+                f"Orei Matrix did not switch output {output_id} to input {input_id}"
+            )
+
+    async def async_set_output_sources(self, routes: dict[int, int]) -> dict[int, bool]:
+        """Route several outputs in one batch ({output: input}).
+
+        The client verifies every route, so confirmed ones go straight into
+        the cache, unless a later route for the output has superseded them;
+        only a route that failed makes the routing poll run early, to find
+        out what the output shows instead. Returns {output: success}.
+        """
+        results = await self.client.set_output_sources(routes)
+        taken = {
+            out: inp for out, inp in routes.items()
+            if results.get(out) and self.client.requested_source(out) == inp
+        }
+        if taken:
+            self._async_write_through(routes=taken)
+        if not all(results.values()):
+            self._next_poll["outputs"] = 0.0
+            await self._confirm.async_call()
+        return results
+
+    async def async_apply_routes(self, routes: dict[int, int]) -> dict[int, bool]:
+        """Send only the routes that differ from the cache, as one batch.
+
+        Returns {output: success} for the routes that were sent.
+        """
+        routing = self.routing
+        changes = {out: inp for out, inp in routes.items() if routing.source(out) != inp}
+        if not changes:
+            return {}
+        return await self.async_set_output_sources(changes)
+
+    async def async_follow_input(self, from_input: int, to_input: int) -> dict[int, bool]:
+        """Switch every output showing `from_input` to `to_input`, as one batch.
+
+        Returns {output: success} for the routes that were sent.
+        """
+        if from_input == to_input:
+            return {}
+        changes = dict.fromkeys(sorted(self.routing.outputs_showing(from_input)), to_input)
+        if not changes:
+            return {}
+        return await self.async_set_output_sources(changes)
+
+    async def async_send_cec(self, command: str, inputs=(), outputs=(), sources_of=()) -> dict:
+        """Send a CEC command to inputs, outputs and the sources shown on zones.
+
+        `sources_of` names outputs whose current source device should get
+        the command; it is merged with `inputs`, so zones sharing a source
+        send one command. Returns {"in N" / "out N": result}.
+        """
+        routing = self.routing
+        inputs = set(inputs) | {
+            source for out in sources_of if (source := routing.source(out)) is not None
+        }
+        results = await self.client.send_cec(command, inputs=inputs, outputs=outputs)
+        return {
+            f"{direction} {port}": (
+                {"success": False, "error": str(result) or type(result).__name__}
+                if isinstance(result, Exception)
+                else {"success": True, "response": result}
+            )
+            for (direction, port), result in results.items()
+        }
+
+    async def async_set_power(self, state: bool):
+        """Switch matrix power and update the cache optimistically."""
+        await self.client.set_power(state)
+        self._async_write_through(power=state)
+        self._next_poll["power"] = 0.0
+        await self._confirm.async_call()